@@ -0,0 +1,178 @@
+"""
+Pre-aggregated views of the NJDG cases for the analytics pages.
+
+``build_case_cube`` rolls the per-case table up once into cells keyed by
+filing year × stage × judge × status, holding additive measures only
+(counts and sums). Any filter on the dimensions followed by a ``rollup``
+gives the same totals, rates and means as the raw rows, from a table that
+is a tiny fraction of their size.
+
+``build_value_summaries`` keeps per-year value counts of the day/count
+metrics, from which histograms and quantile thresholds are read.
+"""
+
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ["filing_year", "stage", "judge", "status"]
+
+# Additive measures per cell
+CUBE_MEASURES = [
+    "cases",
+    "disposed",
+    "over_1yr",
+    "disposal_days_sum",
+    "disposal_days_count",
+    "hearings",
+]
+
+
+def _column(df, *names):
+    """First of ``names`` present in ``df`` (all-missing Series if none)."""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(np.nan, index=df.index)
+
+
+def build_case_cube(case_facts):
+    """
+    Cube cells of ``case_facts`` (one row per case, see Dataset.case_facts).
+    Stage and judge are taken at the case's latest hearing (the judge falls
+    back to the NJDG judge name for cases without hearings). Missing
+    dimension values form their own cells, so filters see every case.
+    """
+    disposal = pd.to_numeric(_column(case_facts, "disposal_days"), errors="coerce")
+    # Per row: cases without hearings have no last judge but an NJDG one
+    judge = _column(case_facts, "last_judge").astype(object).fillna(
+        _column(case_facts, "njdg_judge_name").astype(object)
+    )
+
+    rows = pd.DataFrame({
+        "filing_year": _column(case_facts, "filing_year"),
+        "stage": _column(case_facts, "last_stage"),
+        "judge": judge.astype("category"),
+        "status": _column(case_facts, "current_status"),
+        "disposed": disposal.gt(0),
+        "over_1yr": disposal.gt(365),
+        "disposal_days": disposal,
+        "hearings": pd.to_numeric(_column(case_facts, "hearing_count"), errors="coerce"),
+    })
+
+    cube = rows.groupby(CUBE_DIMENSIONS, dropna=False, observed=True, sort=False).agg(
+        cases=("disposed", "size"),
+        disposed=("disposed", "sum"),
+        over_1yr=("over_1yr", "sum"),
+        disposal_days_sum=("disposal_days", "sum"),
+        disposal_days_count=("disposal_days", "count"),
+        hearings=("hearings", "sum"),
+    )
+    return cube.reset_index()
+
+
+def slice_cube(cube, years=None):
+    """Cells of the selected filing years (all cells when ``years`` is empty)."""
+    if not years:
+        return cube
+    return cube[cube["filing_year"].isin(years)]
+
+
+def rollup(cube, by=None):
+    """
+    Measures summed over ``by`` (a dimension or list of them; None gives
+    the grand total as a Series). Cells with a missing ``by`` value are left
+    out, like a groupby over the raw rows.
+    """
+    if by is None:
+        return cube[CUBE_MEASURES].sum()
+    return cube.groupby(by, observed=True)[CUBE_MEASURES].sum()
+
+
+def mean_disposal_days(totals):
+    """Mean disposal days from rolled-up measures (NaN where nothing is disposed)."""
+    return totals["disposal_days_sum"] / totals["disposal_days_count"].replace(0, np.nan)
+
+
+# -------------------------------
+# Value summaries
+# -------------------------------
+SUMMARY_METRICS = ["disposal_days", "total_hearings", "case_duration"]
+
+
+def _metric_values(cases, metric):
+    if metric == "case_duration" and {"date_filed", "decision_date"}.issubset(cases.columns):
+        return (cases["decision_date"] - cases["date_filed"]).dt.days
+    return pd.to_numeric(_column(cases, metric), errors="coerce")
+
+
+def build_value_summaries(cases, metrics=SUMMARY_METRICS):
+    """
+    Mergeable summaries of day/count metrics: per metric and filing year,
+    how many cases have each distinct value. The metrics are whole numbers
+    with a bounded range, so these counts are an exact quantile sketch whose
+    size does not grow with the number of cases; years merge by adding
+    counts. Missing values are left out (missing years form their own group).
+    """
+    years = _column(cases, "filing_year")
+    parts = []
+    for metric in metrics:
+        rows = pd.DataFrame({"filing_year": years, "value": _metric_values(cases, metric)})
+        counts = (
+            rows.dropna(subset=["value"])
+            .groupby(["filing_year", "value"], dropna=False)
+            .size()
+            .rename("count")
+            .reset_index()
+        )
+        counts.insert(0, "metric", metric)
+        parts.append(counts)
+    return pd.concat(parts, ignore_index=True)
+
+
+def metric_counts(summaries, metric, years=None):
+    """Cases per distinct ``metric`` value over the selected years (all when empty)."""
+    rows = summaries[summaries["metric"] == metric]
+    if years:
+        rows = rows[rows["filing_year"].isin(years)]
+    return rows.groupby("value")["count"].sum()
+
+
+def weighted_quantile(values, counts, q):
+    """
+    Quantile(s) ``q`` of values repeated ``counts`` times, interpolated
+    like ``Series.quantile`` (linear). NaN when there are no values.
+    """
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    order = np.argsort(values, kind="stable")
+    values, cumulative = values[order], np.cumsum(counts[order])
+
+    n = cumulative[-1] if len(cumulative) else 0
+    q = np.asarray(q, dtype=float)
+    if n == 0:
+        return np.full(q.shape, np.nan) if q.ndim else np.nan
+
+    h = (n - 1) * q
+    lo = np.floor(h)
+    below = values[np.searchsorted(cumulative, lo, side="right")]
+    above = values[np.searchsorted(cumulative, np.minimum(lo + 1, n - 1), side="right")]
+    return below + (h - lo) * (above - below)
+
+
+def metric_quantile(summaries, metric, q, years=None):
+    """Quantile(s) of ``metric`` over the selected years, from the summaries."""
+    counts = metric_counts(summaries, metric, years)
+    return weighted_quantile(counts.index, counts.to_numpy(), q)
+
+
+def metric_histogram(summaries, metric, bins=40, years=None):
+    """
+    Equal-width histogram of ``metric`` over the selected years:
+    ``bin_start``, ``bin_end`` and ``count`` per bin (``bins`` rows at most).
+    """
+    counts = metric_counts(summaries, metric, years)
+    if counts.empty:
+        return pd.DataFrame(columns=["bin_start", "bin_end", "count"])
+
+    hist, edges = np.histogram(counts.index.to_numpy(dtype=float), bins=bins, weights=counts.to_numpy())
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": hist.astype(np.int64)})
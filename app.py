@@ -2,7 +2,7 @@ import os
 import sys
 import io
 import streamlit as st
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from dataset import get_cases
 import base64
 from pathlib import Path
 import warnings
@@ -210,11 +210,7 @@ st.markdown("<div style='height: 50px;'></div>", unsafe_allow_html=True)
 # -------------------------------------------------
 # LOAD DATA (Statistics)
 # -------------------------------------------------
-cases, hearings = load_data()
-cases = clean_cases(cases)
-hearings = clean_hearings(hearings)
-
-merged = merge_data(cases, hearings)
+cases = get_cases(["cnr_number", "disposal_days"])
 
 total_cases = len(cases)
 civil_cases = len(cases)
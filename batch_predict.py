@@ -0,0 +1,184 @@
+"""
+Offline scoring of the docket with the trained disposal model.
+
+Streams the cases from their Parquet snapshot through the newest model
+artifact (see disposal_model.py) in bounded batches spread over a process
+pool, and writes the predicted disposal days, interval bounds and dates to
+a Parquet file (CSV when pyarrow is missing).
+Throughput and peak memory are reported at the end.
+
+Usage: python batch_predict.py [output] [--all] [--workers N] [--batch-size N]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from disposal_model import CASE_COLUMNS, iter_cases, latest_model_path, load_cases, load_model, model_inputs, predict
+from ingest import DEFAULT_MAX_MEMORY_MB, stream_hearing_aggregates
+from preprocessing import BASE_DIR
+from snapshot import parquet_available
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+DEFAULT_OUTPUT = BASE_DIR / "data" / "predictions.parquet"
+DEFAULT_BATCH_SIZE = 100000
+
+# Filing date is needed to turn predicted days into a date
+BATCH_COLUMNS = tuple(sorted(set(CASE_COLUMNS) | {"date_filed"}))
+
+
+# -------------------------------
+# Worker side
+# -------------------------------
+_artifact = None
+
+
+def _load_artifact(path):
+    # Once per worker process, not once per batch
+    global _artifact
+    _artifact = load_model(path)
+
+    # The pool provides the parallelism; one OpenMP thread per worker keeps
+    # the workers from oversubscribing the cores
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def _score(inputs):
+    return predict(_artifact, inputs)
+
+
+# -------------------------------
+# Output
+# -------------------------------
+class _Writer:
+    """Appends result batches to one Parquet (or CSV) file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = parquet_available() and self.path.suffix != ".csv"
+        if not self.parquet:
+            self.path = self.path.with_suffix(".csv")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = None
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._tmp.unlink(missing_ok=True)   # left over by an interrupted run
+        self.rows = 0
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._tmp, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self._tmp, mode="a", header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self, empty):
+        if self.rows == 0:
+            self.write(empty)
+        if self._writer is not None:
+            self._writer.close()
+        os.replace(self._tmp, self.path)
+
+
+def _results(batch, scores):
+    predicted, low, high = scores
+    filed = batch["date_filed"] if "date_filed" in batch.columns else pd.Series(pd.NaT, index=batch.index)
+    return pd.DataFrame({
+        "cnr_number": batch["cnr_number"].astype(str).to_numpy(),
+        "date_filed": filed.to_numpy(),
+        "predicted_disposal_days": predicted,
+        "best_case_days": low,
+        "worst_case_days": high,
+        "predicted_disposal_date": (filed + pd.to_timedelta(predicted, unit="D")).to_numpy(),
+    })
+
+
+# -------------------------------
+# Run
+# -------------------------------
+def run(output=DEFAULT_OUTPUT, pending_only=True, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+        max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    """
+    Score the pending cases (every case unless ``pending_only``) and write
+    the results to ``output``; returns ``(path, rows, load_seconds,
+    score_seconds)``. The per-case hearing facts are aggregated up front
+    (within ``max_memory_mb``); the cases are then read from the snapshot
+    one batch at a time with at most two batches per worker in flight, so
+    memory is bounded by the hearing facts and the batch size rather than
+    the whole cases table.
+    """
+    model_path = latest_model_path()
+    if model_path is None:
+        raise SystemExit("No trained model found; run `python disposal_model.py` first.")
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    hearing_facts = stream_hearing_aggregates(max_memory_mb=max_memory_mb)
+    loaded = time.perf_counter()
+
+    writer = _Writer(output)
+    in_flight = deque()
+    empty = None
+    with ProcessPoolExecutor(workers, initializer=_load_artifact, initargs=(str(model_path),)) as pool:
+        for batch in iter_cases(BATCH_COLUMNS, batch_size):
+            if pending_only:
+                batch = batch[batch["disposal_days"].isna()]
+            if empty is None:
+                empty = batch.iloc[:0]
+            if batch.empty:
+                continue
+            in_flight.append((batch, pool.submit(_score, model_inputs(batch, hearing_facts))))
+            if len(in_flight) >= 2 * workers:
+                batch, future = in_flight.popleft()
+                writer.write(_results(batch, future.result()))
+        while in_flight:
+            batch, future = in_flight.popleft()
+            writer.write(_results(batch, future.result()))
+
+    if empty is None:   # no cases at all
+        empty = load_cases(BATCH_COLUMNS)
+    writer.close(_results(empty, ([], [], [])))
+    return writer.path, writer.rows, loaded - start, time.perf_counter() - loaded
+
+
+def _peak_memory():
+    """Peak resident memory of this process and of its largest worker."""
+    if resource is None:
+        return "n/a"
+    # ru_maxrss is in KiB on Linux (bytes on macOS)
+    scale = 1024 ** 2 if os.uname().sysname == "Darwin" else 1024
+    main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    worker = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return f"{main:,.0f} MB (main), {worker:,.0f} MB (largest worker)"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score cases with the trained disposal model.")
+    parser.add_argument("output", nargs="?", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--all", action="store_true", help="score disposed cases too")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-memory-mb", type=int, default=DEFAULT_MAX_MEMORY_MB)
+    args = parser.parse_args()
+
+    path, rows, load_s, score_s = run(args.output, not args.all, args.workers, args.batch_size, args.max_memory_mb)
+
+    print(f"Aggregated hearing facts in {load_s:.1f} s")
+    print(f"Scored {rows:,} cases in {score_s:.1f} s ({rows / max(score_s, 1e-9):,.0f} cases/s)")
+    print(f"Peak memory: {_peak_memory()}")
+    print(f"Wrote {path}")
@@ -0,0 +1,71 @@
+"""
+Delay-risk and bottleneck labels: row-by-row apply vs. predictions.py.
+
+Usage: python benchmarks/bench_classification.py [n_cases]
+"""
+
+import sys
+import time
+
+from synthetic import make_cases
+
+from predictions import classify_delay_risk, detect_bottlenecks
+from preprocessing import clean_cases
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def apply_labels(cases, low_th, high_th, min_year):
+    # The rules as the AI_Predictions page had them
+    def delay_risk(days):
+        if days <= low_th:
+            return "Low"
+        elif days <= high_th:
+            return "Medium"
+        return "High"
+
+    def detect_bottleneck(row):
+        reasons = []
+        if row["total_hearings"] >= 8:
+            reasons.append("High hearings")
+        if row["filing_year"] <= min_year + 1:
+            reasons.append("Old backlog")
+        return " & ".join(reasons) if reasons else "Normal flow"
+
+    return (
+        cases["predicted_disposal"].apply(delay_risk),
+        cases.apply(detect_bottleneck, axis=1),
+    )
+
+
+def vectorized_labels(cases, low_th, high_th, min_year):
+    return (
+        classify_delay_risk(cases["predicted_disposal"], low_th, high_th),
+        detect_bottlenecks(cases["total_hearings"], cases["filing_year"], min_year),
+    )
+
+
+if __name__ == "__main__":
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    cases = clean_cases(make_cases(n_cases))[["total_hearings", "filing_year"]]
+    min_year = cases["filing_year"].min()
+    cases["predicted_disposal"] = (
+        cases["total_hearings"] * 20 + (cases["filing_year"] - min_year) * 10 + 100
+    ).round(0)
+    low_th, high_th = cases["predicted_disposal"].quantile([0.33, 0.66])
+
+    old, old_s = timed(apply_labels, cases, low_th, high_th, min_year)
+    new, new_s = timed(vectorized_labels, cases, low_th, high_th, min_year)
+
+    identical = all(
+        list(o) == list(n.astype(object)) for o, n in zip(old, new)
+    )
+    print(f"{n_cases:,} cases")
+    print(f"  apply (row by row) : {old_s:8.2f} s")
+    print(f"  vectorized         : {new_s:8.2f} s  ({old_s / max(new_s, 1e-9):.1f}x faster)")
+    print(f"  identical labels   : {identical}")
@@ -0,0 +1,50 @@
+"""
+Wall time per CSV parsing backend on a synthetic hearings file.
+
+Usage: python benchmarks/bench_csv_backends.py [size_mb] [workers]
+Defaults to a 5 GB file; it is written once to the temp directory and reused.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_tables
+
+from csv_backends import BACKENDS, read_csv, resolve_backend
+
+
+def write_hearings(path, size_mb):
+    """Append synthetic hearing blocks until the file reaches ``size_mb``."""
+    target = size_mb * 1024 ** 2
+    if path.exists() and path.stat().st_size >= target:
+        return
+
+    _, block = make_tables(50_000, 500_000)
+    block.to_csv(path, index=False)
+    seed = 2
+    while path.stat().st_size < target:
+        _, block = make_tables(50_000, 500_000, seed=seed)
+        block.to_csv(path, mode="a", header=False, index=False)
+        seed += 1
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 1024
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    path = Path(tempfile.gettempdir()) / f"njdg_hearings_{size_mb}mb.csv"
+    write_hearings(path, size_mb)
+    print(f"{path} ({path.stat().st_size / 1024 ** 2:,.0f} MB), {workers} workers")
+
+    for backend in BACKENDS:
+        if resolve_backend(backend) != backend:
+            print(f"  {backend:<8} not available")
+            continue
+        start = time.perf_counter()
+        df = read_csv(path, backend=backend, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"  {backend:<8} {elapsed:8.2f} s  {len(df):,} rows")
+        del df
@@ -0,0 +1,35 @@
+"""
+Date parsing on hearing rows: per-element inference vs. dates.parse_date.
+
+Usage: python benchmarks/bench_dates.py [n_hearings]
+"""
+
+import sys
+import time
+
+import pandas as pd
+
+from synthetic import make_tables
+
+from dates import parse_date
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_hearings = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+
+    _, hearings = make_tables(max(n_hearings // 10, 1), n_hearings)
+    raw = hearings["BusinessOnDate"]   # dd-mm-yyyy strings
+
+    old, old_s = timed(lambda s: pd.to_datetime(s, errors="coerce", dayfirst=True), raw)
+    new, new_s = timed(parse_date, raw)
+
+    print(f"{n_hearings:,} hearing dates ({raw.nunique():,} distinct)")
+    print(f"  to_datetime (inferred) : {old_s:8.2f} s")
+    print(f"  parse_date             : {new_s:8.2f} s  ({old_s / max(new_s, 1e-9):.1f}x faster)")
+    print(f"  identical              : {old.equals(new)}")
@@ -0,0 +1,54 @@
+"""
+Chunked merge+concat (previous merge_data) vs. the indexed merge_data.
+
+Usage: python benchmarks/bench_merge.py [n_hearings ...]
+Defaults to 1M, 10M and 50M hearing rows (one case per 10 hearings).
+"""
+
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from synthetic import make_tables
+
+from preprocessing import clean_cases, merge_data, normalize_columns
+
+
+def merge_chunked(cases, hearings, chunk_size=100000):
+    """The previous merge_data implementation."""
+    merged_chunks = []
+    for start in range(0, len(hearings), chunk_size):
+        chunk = hearings.iloc[start:start+chunk_size]
+        merged_chunks.append(chunk.merge(cases, on='cnr_number', how='left'))
+    return pd.concat(merged_chunks, ignore_index=True)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000, 10_000_000, 50_000_000]
+
+    mb = 1024 ** 2
+    for n_hearings in sizes:
+        cases, hearings = make_tables(max(n_hearings // 10, 1), n_hearings)
+        cases = clean_cases(cases)
+        hearings = normalize_columns(hearings)   # keep duplicate CNRs: full hearing history
+
+        old, old_s, old_peak = measure(merge_chunked, cases, hearings)
+        del old
+        new, new_s, new_peak = measure(merge_data, cases, hearings)
+        del new
+
+        print(f"{n_hearings:>12,} hearings")
+        print(f"  chunked concat : {old_s:8.2f} s  peak {old_peak / mb:9.1f} MB")
+        print(f"  indexed join   : {new_s:8.2f} s  peak {new_peak / mb:9.1f} MB  ({old_s / max(new_s, 1e-9):.1f}x faster)")
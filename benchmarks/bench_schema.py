@@ -0,0 +1,52 @@
+"""
+Memory and Analytics-style aggregation time: inferred dtypes vs. schema.py.
+
+Usage: python benchmarks/bench_schema.py [n_cases] [n_hearings]
+"""
+
+import sys
+import time
+
+from synthetic import make_tables
+
+from schema import apply_schema, normalize_name
+
+
+def as_object(df):
+    """What plain read_csv inference gives for the string columns."""
+    return df.astype({c: object for c in df.columns if df[c].dtype.kind not in "iuf"})
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def analytics_ops(cases, hearings):
+    return {
+        "funnel value_counts": lambda: hearings["remappedstages"].value_counts(),
+        "judge value_counts": lambda: hearings["beforehonourablejudges"].value_counts(),
+        "status groupby": lambda: cases.groupby("current_status", observed=True)["total_hearings"].mean(),
+    }
+
+
+def report(label, cases, hearings):
+    mb = (cases.memory_usage(deep=True).sum() + hearings.memory_usage(deep=True).sum()) / 1024 ** 2
+    print(f"{label:<10} memory {mb:9.1f} MB")
+    for name, op in analytics_ops(cases, hearings).items():
+        print(f"{'':<10} {name:<22} {timed(op):8.2f} ms")
+
+
+if __name__ == "__main__":
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_hearings = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+
+    cases, hearings = make_tables(n_cases, n_hearings)
+    cases.columns = [normalize_name(c) for c in cases.columns]
+    hearings.columns = [normalize_name(c) for c in hearings.columns]
+    cases["total_hearings"] = cases["total_hearings"].astype("int64")
+
+    report("inferred", as_object(cases), as_object(hearings))
+    report("schema", apply_schema(cases.copy()), apply_schema(hearings.copy()))
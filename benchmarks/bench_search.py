@@ -0,0 +1,64 @@
+"""
+Recall of CaseSearch for CNRs and case numbers typed with one typo.
+
+Each query is a key with one character substituted, deleted or inserted.
+Reports how often ``suggest`` lists the intended case among its first
+``limit`` suggestions (and their time per query), and how often
+``fuzzy`` finds it at all: the filter must never drop it.
+
+Usage: python benchmarks/bench_search.py [n_cases] [n_queries]
+"""
+
+import sys
+import time
+
+import numpy as np
+from synthetic import make_cases
+
+from search import CaseSearch, normalize_key
+
+ALPHABET = np.array(list("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+LIMIT = 10
+
+
+def one_typo(key, rng):
+    """``key`` with one random substitution, deletion or insertion."""
+    position = int(rng.integers(len(key)))
+    kind = rng.integers(3)
+    if kind == 0:
+        other = rng.choice(ALPHABET[ALPHABET != key[position]])
+        return key[:position] + other + key[position + 1:]
+    if kind == 1:
+        return key[:position] + key[position + 1:]
+    return key[:position] + rng.choice(ALPHABET) + key[position:]
+
+
+def recall(search, queries, expected):
+    suggested = found = 0
+    seconds = 0.0
+    for query, cnr in zip(queries, expected):
+        start = time.perf_counter()
+        suggested += cnr in search.suggest(query, LIMIT)
+        seconds += time.perf_counter() - start
+        found += search._cnrs.get_loc(cnr) in search.fuzzy(query, limit=len(search))
+    return suggested / len(queries), found / len(queries), seconds / len(queries)
+
+
+if __name__ == "__main__":
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    cases = make_cases(n_cases)
+    start = time.perf_counter()
+    search = CaseSearch(cases["CNR_NUMBER"], cases["CombinedCaseNumber"])
+    build_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    picked = rng.integers(n_cases, size=n_queries)
+    print(f"{n_cases:,} cases, index built in {build_s:.1f} s")
+    for column in ("CNR_NUMBER", "CombinedCaseNumber"):
+        queries = [one_typo(normalize_key(cases[column].iloc[i]), rng) for i in picked]
+        expected = cases["CNR_NUMBER"].iloc[picked]
+        in_top, in_fuzzy, per_query = recall(search, queries, expected)
+        print(f"  {column:<18} suggest@{LIMIT}: {in_top:6.1%}   fuzzy: {in_fuzzy:6.1%}   "
+              f"{per_query * 1000:6.1f} ms/suggest")
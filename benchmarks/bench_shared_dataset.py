@@ -0,0 +1,65 @@
+"""
+Memory held by per-page cleaned copies vs. the shared dataset registry.
+
+Usage: python benchmarks/bench_shared_dataset.py [n_cases] [n_hearings]
+"""
+
+import sys
+import tracemalloc
+
+from synthetic import make_tables
+
+from dataset import Dataset
+from preprocessing import clean_cases, clean_hearings, merge_data
+
+# Pages that used to keep their own cleaned/merged copy
+PAGES = ["app", "Analytics", "Judge_Dashboard", "Lawyer_Dashboard", "Login",
+         "AI_Predictions", "DownloadCasePDF", "VerifyCase"]
+
+
+def per_page(raw_cases, raw_hearings):
+    held = []
+    for _ in PAGES:
+        cases = clean_cases(raw_cases.copy())
+        hearings = clean_hearings(raw_hearings.copy())
+        held.append((cases, hearings, merge_data(cases, hearings)))
+    return held
+
+
+def shared(raw_cases, raw_hearings):
+    cases = clean_cases(raw_cases.copy())
+    hearings = clean_hearings(raw_hearings.copy())
+    merged = merge_data(cases, hearings)
+    dataset = Dataset(None, cases, hearings, merged, hearings.iloc[:0], marks=None)
+
+    views = []
+    for _ in PAGES:
+        merged = dataset.merged
+        merged["age_days"] = 0   # pages add their own columns to the view
+        views.append((dataset.cases, dataset.hearings, merged))
+    return dataset, views
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    result = fn(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+if __name__ == "__main__":
+    n_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_hearings = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+
+    raw_cases, raw_hearings = make_tables(n_cases, n_hearings)
+
+    old_held, old_peak = measure(per_page, raw_cases, raw_hearings)
+    new_held, new_peak = measure(shared, raw_cases, raw_hearings)
+
+    mb = 1024 ** 2
+    print(f"{len(PAGES)} pages, {n_cases:,} cases, {n_hearings:,} hearings")
+    print(f"per-page copies : held {old_held / mb:8.1f} MB  peak {old_peak / mb:8.1f} MB")
+    print(f"shared registry : held {new_held / mb:8.1f} MB  peak {new_peak / mb:8.1f} MB")
+    print(f"saved           : {(old_held - new_held) / mb:8.1f} MB ({old_held / max(new_held, 1):.1f}x less)")
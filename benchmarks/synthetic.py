@@ -0,0 +1,69 @@
+"""
+Synthetic NJDG-shaped tables for the benchmarks.
+
+Column names follow the raw CSV headers, so the frames can be fed straight
+into ``clean_cases`` / ``clean_hearings`` or written out as CSV.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Benchmarks run as scripts; make the app modules importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ADVOCATES = [
+    "RAMESH KUMAR", "SURESH BABU", "A NAGARAJ", "PRIYA SHARMA",
+    "K R RAO", "M S HEGDE", "LATHA DEVI", "ANIL KUMAR",
+]
+JUDGES = [
+    "HON'BLE JUSTICE A", "HON'BLE JUSTICE B", "HON'BLE JUSTICE C",
+    "HON'BLE JUSTICE D", "HON'BLE JUSTICE E",
+]
+STAGES = ["ADMISSION", "HEARING", "ARGUMENTS", "ORDERS", "DISPOSED"]
+PURPOSES = ["ADJOURNED", "FOR ORDERS", "HEARING", "FOR ADMISSION"]
+
+
+def make_cases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    filed = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5000, n), unit="D")
+    decided = pd.Series(filed + pd.to_timedelta(rng.integers(10, 2000, n), unit="D"))
+    decided = decided.where(rng.random(n) > 0.3)
+
+    return pd.DataFrame({
+        "CNR_NUMBER": [f"KAHC01{i:06d}{2010 + i % 14}" for i in range(n)],
+        "CombinedCaseNumber": [f"WP/{i}/{2010 + i % 14}" for i in range(n)],
+        "CASE_TYPE": rng.choice(["WP", "CRL.P", "RFA", "MFA", "RSA"], n),
+        "COURT_NAME": rng.choice(["Principal Bench", "Dharwad Bench", "Kalaburagi Bench"], n),
+        "DATE_FILED": filed.strftime("%Y-%m-%d"),
+        "REGISTRATION_DATE": filed.strftime("%Y-%m-%d"),
+        "DECISION_DATE": decided.dt.strftime("%Y-%m-%d"),
+        "CURRENT_STATUS": np.where(decided.notna(), "Disposed", "Pending"),
+        "TOTAL_HEARINGS": rng.integers(0, 25, n),
+        "PetitionerAdvocate": rng.choice(ADVOCATES, n),
+        "RespondentAdvocate": rng.choice(ADVOCATES, n),
+        "NJDG_JUDGE_NAME": rng.choice(JUDGES, n),
+    })
+
+
+def make_hearings(n, cnrs, seed=1):
+    rng = np.random.default_rng(seed)
+    business = pd.Timestamp("2011-01-01") + pd.to_timedelta(rng.integers(0, 5000, n), unit="D")
+
+    return pd.DataFrame({
+        "CNR_NUMBER": rng.choice(np.asarray(cnrs), n),
+        "BusinessOnDate": business.strftime("%d-%m-%Y"),
+        "BeforeHonourableJudges": rng.choice(JUDGES, n),
+        "PurposeOfListing": rng.choice(PURPOSES, n),
+        "remappedstages": rng.choice(STAGES, n),
+        "NextHearingDate": (business + pd.Timedelta(days=30)).strftime("%Y-%m-%d"),
+        "PreviousHearing": (business - pd.Timedelta(days=30)).strftime("%Y-%m-%d"),
+    })
+
+
+def make_tables(n_cases, n_hearings, seed=0):
+    cases = make_cases(n_cases, seed)
+    hearings = make_hearings(n_hearings, cases["CNR_NUMBER"], seed + 1)
+    return cases, hearings
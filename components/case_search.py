@@ -0,0 +1,28 @@
+import streamlit as st
+
+from dataset import get_case_search
+
+
+def case_search_input(label, key, limit=10, dataset=None):
+    """
+    Text input with CNR suggestions: partial or mistyped CNRs / case numbers
+    list the closest cases to pick from. Returns the chosen CNR, or the
+    typed text when nothing matches ("" while empty). Pass the page's
+    ``dataset`` so the suggestions come from the data the page shows.
+    """
+    query = st.text_input(label, key=key)
+    if not query.strip():
+        return ""
+
+    search = get_case_search(dataset)
+    matches = search.suggest(query, limit)
+    if not matches:
+        st.caption("No matching cases")
+        return query.strip()
+
+    return st.selectbox(
+        "Matching cases",
+        matches,
+        format_func=search.describe,
+        key=f"{key}_match",
+    )
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Points sent to the browser per chart (all series together)
+DEFAULT_MAX_POINTS = int(os.environ.get("NJDG_CHART_POINTS", "2000"))
+
+
+def lttb_indices(y, n_out):
+    """
+    Positions of the ``n_out`` points of ``y`` kept by Largest-Triangle-
+    Three-Buckets: the first and last point, plus per bucket the point that
+    spans the largest triangle with the previously kept point and the next
+    bucket's average. Peaks and dips survive, unlike plain striding.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(df, columns, max_points=DEFAULT_MAX_POINTS):
+    """
+    Rows of ``df`` to plot ``columns`` against its index with at most
+    ``max_points`` rows: LTTB per series (missing values skipped), then the
+    union of the kept rows so every series shares one x axis.
+    """
+    if len(df) <= max_points:
+        return df[columns]
+
+    budget = max(3, max_points // len(columns))
+    keep = []
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        keep.append(valid[lttb_indices(values[valid], budget)])
+
+    rows = np.unique(np.concatenate(keep)) if keep else np.empty(0, dtype=np.int64)
+    return df.iloc[rows][columns]
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_downsample(_df, columns, max_points, cache_key):
+    # ``_df`` is not hashed; ``cache_key`` identifies its contents
+    return downsample(_df, list(columns), max_points)
+
+
+def line_chart(df, columns, cache_key, max_points=DEFAULT_MAX_POINTS):
+    """
+    ``st.line_chart`` of ``columns`` after downsampling to ``max_points``.
+    ``cache_key`` must identify the data (e.g. dataset version plus the
+    parameters that produced it); the downsampled rows are cached per key.
+    """
+    st.line_chart(_cached_downsample(df, tuple(columns), max_points, cache_key))
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def _matches(values, text):
+    """Row mask of ``values`` containing ``text`` (case-insensitive)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Match the categories once, then the codes
+        hit = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hit))
+    return values.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+
+
+def _sorted(values, positions, ascending):
+    """``positions`` ordered by ``values`` (missing values last, stable)."""
+    subset = pd.Series(values.to_numpy()[positions])
+    order = subset.sort_values(ascending=ascending, na_position="last", kind="stable").index
+    return positions[order.to_numpy()]
+
+
+def paginated_table(df, key, columns=None, page_size=50, sort_by=None, ascending=True, style=None):
+    """
+    Show ``df`` one page at a time. Filtering, sorting and page slicing run
+    on the server; only the visible rows (restricted to ``columns``) are
+    styled by ``style`` (a ``Styler -> Styler`` callable) and sent to the
+    browser, so the payload of a rerun is bounded by ``page_size``.
+    """
+    columns = list(columns or df.columns)
+
+    c1, c2, c3, c4 = st.columns([2, 3, 2, 1])
+    filter_col = c1.selectbox("Filter column", columns, key=f"{key}_filter_col")
+    text = c2.text_input("Contains", key=f"{key}_filter")
+    sort_options = [None] + columns   # None keeps the frame's order
+    sort_col = c3.selectbox(
+        "Sort by",
+        sort_options,
+        index=sort_options.index(sort_by) if sort_by in columns else 0,
+        format_func=lambda c: "(unsorted)" if c is None else c,
+        key=f"{key}_sort",
+    )
+    descending = c4.checkbox("Desc", value=not ascending, key=f"{key}_desc")
+
+    positions = np.arange(len(df))
+    if text:
+        positions = positions[_matches(df[filter_col], text)]
+    if sort_col is not None:
+        positions = _sorted(df[sort_col], positions, not descending)
+
+    total = len(positions)
+    pages = max(1, math.ceil(total / page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages   # the filter shrank the result
+
+    page = st.number_input("Page", 1, pages, key=f"{key}_page")
+    start = (page - 1) * page_size
+    rows = positions[start:start + page_size]
+
+    view = df.iloc[rows][columns]
+    st.dataframe(view if style is None else style(view.style), use_container_width=True)
+    st.caption(f"Rows {min(start + 1, total):,}–{start + len(rows):,} of {total:,} (page {page} of {pages})")
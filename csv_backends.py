@@ -0,0 +1,197 @@
+"""
+Parallel CSV parsing backends.
+
+``read_csv`` parses a source CSV with one of:
+
+- ``"pyarrow"``: pyarrow's multi-threaded CSV reader
+- ``"process"``: the file is split into newline-aligned byte blocks that a
+  process pool parses with the C engine (assumes no line breaks inside
+  quoted fields)
+- ``"c"``: plain single-threaded ``pd.read_csv``
+
+All backends return the same DataFrame as ``pd.read_csv(path)``. The default
+backend comes from the ``NJDG_CSV_BACKEND`` environment variable ("auto" if
+unset: pyarrow when installed, else the C engine). A backend that is not
+available or fails falls back to the C engine.
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from schema import normalize_name
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pyarrow", "process", "c")
+
+# pandas' default NA strings, so pyarrow treats the same cells as missing
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+
+def _pyarrow_available():
+    try:
+        import pyarrow.csv  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_backend(backend=None):
+    """Concrete backend name for ``backend`` (None/"auto" -> best available)."""
+    backend = (backend or os.environ.get("NJDG_CSV_BACKEND", "auto")).lower()
+    if backend == "auto":
+        return "pyarrow" if _pyarrow_available() else "c"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown CSV backend {backend!r}; expected one of {BACKENDS}")
+    if backend == "pyarrow" and not _pyarrow_available():
+        return "c"
+    return backend
+
+
+def _header(path):
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _select(header, columns):
+    if columns is None:
+        return None
+    wanted = {normalize_name(c) for c in columns}
+    return [c for c in header if normalize_name(c) in wanted]
+
+
+# -------------------------------
+# pyarrow backend
+# -------------------------------
+def _read_pyarrow(path, usecols):
+    import pyarrow as pa
+    import pyarrow.csv as pc
+
+    # pandas keeps dates as text; stop pyarrow inferring them
+    with pc.open_csv(path) as reader:
+        inferred = reader.schema
+    as_text = {
+        field.name: pa.string()
+        for field in inferred
+        if pa.types.is_temporal(field.type)
+    }
+
+    table = pc.read_csv(
+        path,
+        read_options=pc.ReadOptions(use_threads=True),
+        convert_options=pc.ConvertOptions(
+            column_types=as_text,
+            include_columns=usecols,
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+            true_values=["True", "TRUE", "true"],
+            false_values=["False", "FALSE", "false"],
+        ),
+    )
+    # Columns with no values at all are float64 in pandas, not object
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table.to_pandas()
+
+
+# -------------------------------
+# Process-pool backend
+# -------------------------------
+def _block_bounds(path, n_blocks):
+    """Byte ranges after the header, each ending on a line break."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        step = max((size - start) // n_blocks, 1)
+
+        bounds = []
+        while start < size:
+            f.seek(min(start + step, size))
+            f.readline()
+            end = min(f.tell(), size)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _read_block(args):
+    path, start, end, names, usecols, dtype = args
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(
+        io.BytesIO(data), header=None, names=names, usecols=usecols, dtype=dtype, low_memory=False
+    )
+
+
+def _kind(values):
+    """What a block's inference made of a column: empty, num, bool or text."""
+    if values.isna().all():
+        return "empty"
+    if pd.api.types.is_bool_dtype(values):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(values):
+        return "num"
+    return "text"
+
+
+def _read_process(path, usecols, workers=None):
+    names = _header(path)
+    workers = workers or os.cpu_count() or 1
+    bounds = _block_bounds(path, workers * 4)
+    if not bounds:
+        return pd.read_csv(path, usecols=usecols)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        blocks = list(pool.map(_read_block, [(path, s, e, names, usecols, None) for s, e in bounds]))
+
+        # Each block infers its own dtypes. Where blocks disagree (e.g. digit
+        # codes like "0000" parsed as numbers in one block only), pandas
+        # would have kept the whole column as text: parse it again as text
+        kinds = {col: {_kind(b[col]) for b in blocks} - {"empty"} for col in blocks[0].columns}
+        mixed = [col for col, k in kinds.items() if len(k) > 1]
+        if mixed:
+            jobs = [(path, s, e, names, mixed, str) for s, e in bounds]
+            for block, text in zip(blocks, pool.map(_read_block, jobs)):
+                block[mixed] = text
+
+    # Blocks where a text column is empty parse it as float; give them the
+    # text dtype so the concatenated column keeps it
+    for col, k in kinds.items():
+        if k == {"text"}:
+            dtype = next(b[col].dtype for b in blocks if _kind(b[col]) == "text")
+            for block in blocks:
+                if block[col].dtype != dtype:
+                    block[col] = block[col].astype(dtype)
+    return pd.concat(blocks, ignore_index=True)
+
+
+# -------------------------------
+# Entry point
+# -------------------------------
+def read_csv(path, columns=None, backend=None, workers=None):
+    """
+    Parse ``path`` with the selected backend. ``columns`` is an optional
+    iterable of normalized column names to keep.
+    """
+    backend = resolve_backend(backend)
+    usecols = _select(_header(path), columns)
+
+    try:
+        if backend == "pyarrow":
+            return _read_pyarrow(path, usecols)
+        if backend == "process":
+            return _read_process(path, usecols, workers)
+    except Exception as e:
+        logger.warning("CSV backend %s failed on %s (%s); using the C engine", backend, path, e)
+
+    return pd.read_csv(path, usecols=usecols, low_memory=False)
@@ -0,0 +1,418 @@
+"""
+Process-wide shared NJDG dataset.
+
+The cases and hearings tables are loaded, cleaned and merged once per process
+and shared by every page and session through ``st.cache_resource``. Rows
+appended to the source CSVs, or new files in ``data/deltas/``, are folded in
+incrementally on the next ``get_dataset`` call, into a new ``Dataset`` that
+replaces the shared one: a Dataset never changes once built, so the frames
+and indexes a page got from it always agree. Pages receive shallow views:
+adding or replacing columns on a view never touches the shared frames.
+"""
+
+import hashlib
+import shutil
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from aggregates import build_case_cube, build_value_summaries
+from disposal_model import latest_model_path, load_model, model_inputs, predict
+from ingest import (
+    aggregate_hearings,
+    finalize_aggregates,
+    pending_delta_files,
+    read_appended,
+    upsert_cases,
+    upsert_hearing_facts,
+    upsert_hearings,
+    upsert_merged,
+    watermark,
+)
+from preprocessing import (
+    CASES_PATH,
+    HEARINGS_PATH,
+    read_sources,
+    clean_cases,
+    clean_hearings,
+    merge_data,
+)
+from indexes import (
+    INDEX_FORMAT,
+    AdvocateIndex,
+    CnrIndex,
+    HearingCalendar,
+    JudgeIndex,
+    load_index,
+    save_index,
+)
+from predictions import LinearPredictor
+from search import CaseSearch
+from snapshot import SNAPSHOT_DIR_NAME, fingerprint
+
+# Copy-on-Write is what makes the shallow views safe (always on in pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# Persisted indexes live next to the snapshots, one directory per version
+INDEX_DIR = CASES_PATH.parent / SNAPSHOT_DIR_NAME
+
+
+def dataset_version():
+    """Version key of the current source files (size + mtime of both CSVs)."""
+    return f"{fingerprint(CASES_PATH)}:{fingerprint(HEARINGS_PATH)}"
+
+
+def _index_root(version):
+    key = f"{INDEX_FORMAT}:{version}"
+    return INDEX_DIR / f"indexes.{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+
+def _remove_stale_indexes(keep):
+    for old in INDEX_DIR.glob("indexes.*"):
+        if old != keep and not old.name.endswith(".tmp"):
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def stored_index(version, name, cls, build):
+    """
+    Index ``name`` of a source ``version``: mapped read-only from disk when
+    a worker already stored it, else built, stored and mapped back. With
+    ``version`` None (in-memory changes) it is only built.
+    """
+    if version is None:
+        return build()
+
+    root = _index_root(version)
+    index = load_index(cls, root / name)
+    if index is None:
+        index = build()
+        shutil.rmtree(root / name, ignore_errors=True)   # unreadable leftovers
+        save_index(index, root / name)
+        _remove_stale_indexes(root)
+        index = load_index(cls, root / name) or index
+    return index
+
+
+class Dataset:
+    """
+    Cleaned cases, hearings and merged frames, plus the per-case hearing
+    facts (one row per CNR, see ``ingest.aggregate_hearings``). Immutable:
+    ``refreshed`` folds new rows into a new Dataset with a bumped
+    ``version``; derived views and indexes are built lazily per Dataset.
+    """
+
+    def __init__(self, version, cases, hearings, merged, hearing_facts, marks,
+                 applied=frozenset(), updates=0, base_version=None, calendars=None):
+        self.version = version
+        self._cases = cases
+        self._hearings = hearings
+        self._merged = merged
+        self._hearing_facts = hearing_facts
+        self._case_facts = None
+        self._cnr_index = None
+        self._advocate_index = None
+        self._judge_index = None
+        self._calendars = dict(calendars or {})
+        self._case_cube = None
+        self._value_summaries = None
+        self._marks = marks
+        self._applied = frozenset(applied)
+        self._updates = updates
+        self._base_version = version if base_version is None else base_version
+
+    @property
+    def cases(self):
+        return self._cases.copy(deep=False)
+
+    @property
+    def hearings(self):
+        return self._hearings.copy(deep=False)
+
+    @property
+    def merged(self):
+        return self._merged.copy(deep=False)
+
+    @property
+    def hearing_facts(self):
+        return self._hearing_facts.copy(deep=False)
+
+    @property
+    def case_facts(self):
+        """Cases with their hearing facts attached: one compact row per case."""
+        if self._case_facts is None:
+            self._case_facts = self._cases.join(self._hearing_facts, on="cnr_number", rsuffix="_hearing")
+        return self._case_facts.copy(deep=False)
+
+    @property
+    def case_cube(self):
+        """Filing year x stage x judge x status cube of ``case_facts`` (see aggregates.py)."""
+        if self._case_cube is None:
+            self._case_cube = build_case_cube(self.case_facts)
+        return self._case_cube.copy(deep=False)
+
+    @property
+    def value_summaries(self):
+        """Per-filing-year value counts of the summary metrics (see aggregates.py)."""
+        if self._value_summaries is None:
+            self._value_summaries = build_value_summaries(self._cases)
+        return self._value_summaries.copy(deep=False)
+
+    @property
+    def cnr_index(self):
+        """CNR -> row position in ``cases``/``case_facts``."""
+        if self._cnr_index is None:
+            self._cnr_index = stored_index(
+                self._stored_version, "cnr", CnrIndex,
+                lambda: CnrIndex(self._cases["cnr_number"]),
+            )
+        return self._cnr_index
+
+    @property
+    def advocate_index(self):
+        """Advocate name (or part of it) -> row positions in ``cases``/``case_facts``."""
+        if self._advocate_index is None:
+            self._advocate_index = stored_index(
+                self._stored_version, "advocates", AdvocateIndex,
+                lambda: AdvocateIndex(self._cases),
+            )
+        return self._advocate_index
+
+    @property
+    def _stored_version(self):
+        # Indexes are persisted only for the data as loaded from the sources;
+        # refreshed data lives in this process only
+        return None if self._updates else self._base_version
+
+    def _judge_column(self, facts):
+        # The judge at the case's latest hearing, else the NJDG judge name
+        return "last_judge" if "last_judge" in facts.columns else "njdg_judge_name"
+
+    @property
+    def judge_index(self):
+        """Normalized judge name -> row positions in ``case_facts``."""
+        if self._judge_index is None:
+            def build():
+                facts = self.case_facts
+                return JudgeIndex(facts[self._judge_column(facts)])
+
+            self._judge_index = stored_index(self._stored_version, "judges", JudgeIndex, build)
+        return self._judge_index
+
+    def hearing_calendar(self, column="nexthearingdate"):
+        """``case_facts`` rows sorted by a hearing date column, per judge and advocate."""
+        if column not in self._calendars:
+            def build():
+                facts = self.case_facts
+                return HearingCalendar(facts, column, self._judge_column(facts))
+
+            self._calendars[column] = stored_index(
+                self._stored_version, f"calendar.{column}", HearingCalendar, build
+            )
+        return self._calendars[column]
+
+    def memory_usage(self):
+        """Bytes held by the shared frames."""
+        return int(sum(
+            df.memory_usage(deep=True).sum()
+            for df in (self._cases, self._hearings, self._merged, self._hearing_facts)
+        ))
+
+    def refreshed(self):
+        """
+        This dataset with the rows appended to the source CSVs and the new
+        files in ``data/deltas/`` applied, as a new Dataset (only the new rows
+        are cleaned and merged); ``self`` when there is nothing new, None when
+        a source was rewritten and a full rebuild is needed.
+        """
+        case_rows, case_mark = read_appended(CASES_PATH, self._marks["cases"])
+        hearing_rows, hearing_mark = read_appended(HEARINGS_PATH, self._marks["hearings"])
+        if case_rows is None or hearing_rows is None:
+            return None
+
+        new_cases = [case_rows] if len(case_rows) else []
+        new_hearings = [hearing_rows] if len(hearing_rows) else []
+        deltas = pending_delta_files(self._applied)
+        for kind, path in deltas:
+            (new_cases if kind == "cases" else new_hearings).append(pd.read_csv(path))
+        if not (new_cases or new_hearings):
+            return self
+
+        cases, hearings, merged, hearing_facts = self._cases, self._hearings, self._merged, self._hearing_facts
+        changed = pd.Index([], dtype=object)
+        touched = pd.Index([], dtype=object)
+
+        if new_cases:
+            delta = clean_cases(pd.concat(new_cases, ignore_index=True), keep="last")
+            cases = upsert_cases(cases, delta)
+            changed = changed.union(delta["cnr_number"].unique())
+
+        if new_hearings:
+            rows = clean_hearings(pd.concat(new_hearings, ignore_index=True), dedupe=False)
+            hearing_facts = upsert_hearing_facts(hearing_facts, rows)
+            touched = pd.Index(rows["cnr_number"].unique())
+            hearings, added = upsert_hearings(hearings, rows)
+            changed = changed.union(added["cnr_number"].unique())
+
+        updates = self._updates + 1
+        dataset = Dataset(
+            f"{self._base_version}+{updates}",
+            cases,
+            hearings,
+            upsert_merged(merged, cases, hearings, changed),
+            hearing_facts,
+            {"cases": case_mark, "hearings": hearing_mark},
+            applied=self._applied | {path.name for _, path in deltas},
+            updates=updates,
+            base_version=self._base_version,
+        )
+
+        # Case rows keep their positions unless cases changed: re-slot only
+        # the rows whose hearing facts changed, in copies of the calendars
+        if not new_cases and self._calendars:
+            positions = pd.Index(cases["cnr_number"]).get_indexer(touched)
+            facts = dataset.case_facts
+            dataset._calendars = {
+                column: calendar.updated(facts, positions[positions >= 0])
+                for column, calendar in self._calendars.items()
+            }
+        return dataset
+
+
+def build_dataset():
+    """Load, clean and merge the source tables (no Streamlit caching)."""
+    marks = {"cases": watermark(CASES_PATH), "hearings": watermark(HEARINGS_PATH)}
+    version = dataset_version()
+
+    cases, hearings = read_sources()
+    # A repeated CNR is a correction: keep its last row, as refreshes do
+    cases = clean_cases(cases, keep="last")
+    hearing_rows = clean_hearings(hearings, dedupe=False)
+    hearing_facts = finalize_aggregates(aggregate_hearings(hearing_rows))
+    hearings = hearing_rows.drop_duplicates(subset="cnr_number")
+    del hearing_rows
+    merged = merge_data(cases, hearings)
+
+    dataset = Dataset(version, cases, hearings, merged, hearing_facts, marks)
+    # Pick up files already waiting in data/deltas/
+    return dataset.refreshed() or dataset
+
+
+class _Shared:
+    """The current Dataset of the process; swapped as a whole on refresh."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dataset = build_dataset()
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_dataset():
+    return _Shared()
+
+
+def get_dataset():
+    """
+    The shared dataset, with any new source rows applied. The Dataset
+    returned never changes: later refreshes replace the shared one, so a
+    page keeps working on the version it started with.
+    """
+    shared = _shared_dataset()
+    with shared.lock:
+        dataset = shared.dataset.refreshed()
+        if dataset is None:
+            dataset = build_dataset()
+        shared.dataset = dataset
+    return dataset
+
+
+def get_cases(columns, dataset=None):
+    """
+    Cleaned cases of the shared dataset restricted to ``columns``
+    (normalized or derived names) plus the CNR. Only a column selection of
+    the fully built ``Dataset.cases`` (same rows and order, refreshed rows
+    included); it saves no load time. Loads that read only some columns
+    are for offline jobs (``disposal_model.load_cases``). Pages that combine
+    several of the helpers below pass the same ``dataset`` (default:
+    ``get_dataset()``) to each, so the results stay row-aligned.
+    """
+    cases = (dataset or get_dataset()).cases
+    keep = set(columns) | {"cnr_number"}
+    return cases[[c for c in cases.columns if c in keep]]
+
+
+def get_cnr_index(dataset=None):
+    """CNR index matching ``get_cases`` row positions."""
+    return (dataset or get_dataset()).cnr_index
+
+
+# Identifier columns the case search indexes
+SEARCH_COLUMNS = ("cnr_number", "combinedcasenumber")
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _case_search(_dataset, version):
+    cases = _dataset.cases
+    return CaseSearch(cases["cnr_number"], cases.get("combinedcasenumber"))
+
+
+def get_case_search(dataset=None):
+    """Shared CNR / case number search (see search.py) for the current data."""
+    dataset = dataset or get_dataset()
+    return _case_search(dataset, dataset.version)
+
+
+def get_value_summaries(dataset=None):
+    """
+    Per-filing-year value counts of disposal days, hearings and case
+    duration for the current data (see ``Dataset.value_summaries``).
+    """
+    return (dataset or get_dataset()).value_summaries
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _linear_predictor(_dataset, version):
+    return LinearPredictor(_dataset.cases)
+
+
+def get_linear_predictor(dataset=None):
+    """
+    Rule-based disposal predictor (see predictions.py) row-aligned with
+    ``get_cases``, built once per dataset version.
+    """
+    dataset = dataset or get_dataset()
+    return _linear_predictor(dataset, dataset.version)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _model_predictions(_dataset, version, model_path):
+    artifact = load_model(model_path)
+    if artifact is None:
+        return None, None
+    # The shared per-case hearing facts: no second pass over the hearings
+    inputs = model_inputs(_dataset.cases, _dataset.hearing_facts)
+    predicted, low, high = predict(artifact, inputs)
+    scores = pd.DataFrame({
+        "predicted_disposal": predicted,
+        "best_case_days": low,
+        "worst_case_days": high,
+    })
+    return artifact, scores
+
+
+def get_model_predictions(dataset=None):
+    """
+    ``(artifact, scores)`` of the newest trained disposal model (see
+    disposal_model.py): predicted days and the interval bounds per case
+    (``predicted_disposal``, ``best_case_days``, ``worst_case_days``),
+    row-aligned with ``get_cases`` and computed once per dataset version.
+    ``(None, None)`` when no model has been trained.
+    """
+    path = latest_model_path()
+    if path is None:
+        return None, None
+    dataset = dataset or get_dataset()
+    artifact, scores = _model_predictions(dataset, dataset.version, str(path))
+    return artifact, None if scores is None else scores.copy(deep=False)
@@ -0,0 +1,241 @@
+"""
+Trained disposal-time model.
+
+A histogram gradient-boosted tree regressor (scikit-learn) fitted on the
+disposed cases: hearings, filing year, case type, court, latest stage and
+the mean gap between hearings predict the disposal days. Two more models
+of the same kind, fitted with the quantile loss, give a prediction
+interval whose coverage is measured on a holdout. Training runs
+offline (``python disposal_model.py``) and writes a versioned artifact to
+``data/models/``; pages only load the newest artifact and score cases in
+one batch.
+"""
+
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ingest import STREAM_COLUMNS, aggregate_hearings, finalize_aggregates
+from preprocessing import BASE_DIR, CASES_PATH, HEARINGS_PATH, clean_cases, clean_hearings, source_columns
+from schema import apply_schema
+from snapshot import iter_table, read_table
+
+MODEL_DIR = BASE_DIR / "data" / "models"
+
+# Bump when the features or the artifact layout change; older artifacts
+# are then ignored instead of being scored with the wrong inputs
+MODEL_FORMAT = 2
+KEEP_MODELS = 3
+
+# Case columns the features are built from (plus the target)
+CASE_COLUMNS = ("case_type", "cnr_number", "court_name", "disposal_days", "filing_year", "total_hearings")
+
+NUMERIC_FEATURES = ["total_hearings", "filing_year", "mean_gap_days"]
+CATEGORICAL_FEATURES = ["case_type", "court_name", "last_stage"]
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Categories kept per feature (the tree bins hold at most 255 values with
+# missing); rarer values are scored as missing
+MAX_CATEGORIES = 250
+
+HOLDOUT = 0.2
+
+# Quantiles bounding the prediction interval (best / worst case)
+INTERVAL = (0.1, 0.9)
+
+
+def load_cases(columns=CASE_COLUMNS):
+    """Cleaned cases restricted to ``columns``, read through the snapshot."""
+    return clean_cases(apply_schema(read_table(CASES_PATH, source_columns(columns))), columns)
+
+
+def iter_cases(columns=CASE_COLUMNS, batch_size=100000):
+    """
+    ``load_cases`` in frames of at most ``batch_size`` rows, read batch by
+    batch from the snapshot. A CNR repeated in a later batch is dropped, as
+    ``clean_cases`` does within one frame.
+    """
+    seen = set()
+    for raw in iter_table(CASES_PATH, source_columns(columns), batch_size):
+        batch = clean_cases(apply_schema(raw), columns)
+        cnrs = batch["cnr_number"].to_numpy()
+        fresh = np.fromiter((cnr not in seen for cnr in cnrs), dtype=bool, count=len(cnrs))
+        seen.update(cnrs)
+        yield batch[fresh]
+
+
+def load_hearing_facts():
+    """
+    Per-case hearing facts (see ``ingest.aggregate_hearings``) from the
+    columns of the hearings snapshot the aggregates need.
+    """
+    hearings = apply_schema(read_table(HEARINGS_PATH, sorted(STREAM_COLUMNS)))
+    return finalize_aggregates(aggregate_hearings(clean_hearings(hearings, dedupe=False)))
+
+
+def model_inputs(cases, hearing_facts):
+    """
+    Feature columns for ``cases`` (cleaned, one row per case) in their row
+    order; ``hearing_facts`` are the per-case hearing aggregates indexed by
+    CNR (see ingest.py). Cases without hearings get missing stage and gap.
+    """
+    needed = [col for col in FEATURES if col not in cases.columns and col in hearing_facts.columns]
+    facts = hearing_facts[needed].reindex(cases["cnr_number"].astype(str))
+    inputs = pd.DataFrame(index=cases.index)
+    for col in FEATURES:
+        source = cases if col in cases.columns else facts
+        values = source[col] if col in source.columns else pd.Series(np.nan, index=source.index)
+        inputs[col] = values.to_numpy()
+    return inputs
+
+
+def _encode(inputs, categories):
+    """Float matrix of ``inputs``: categories as codes, unknown ones missing."""
+    matrix = np.empty((len(inputs), len(FEATURES)), dtype=np.float32)
+    for j, col in enumerate(FEATURES):
+        values = inputs[col]
+        if col in categories:
+            codes = values.astype(pd.CategoricalDtype(categories[col])).cat.codes.to_numpy()
+            matrix[:, j] = np.where(codes >= 0, codes, np.nan)
+        else:
+            matrix[:, j] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    return matrix
+
+
+def train(cases, hearing_facts, seed=0):
+    """
+    Fit the models on the disposed ``cases`` and return the artifact: the
+    point and interval estimators, what scoring needs (category lists), and
+    the holdout MAE and interval coverage. The holdout is a random
+    ``HOLDOUT`` share of the disposed cases.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    inputs = model_inputs(cases, hearing_facts)
+    target = pd.to_numeric(cases["disposal_days"], errors="coerce").to_numpy(dtype=float)
+    disposed = np.flatnonzero(target > 0)
+
+    categories = {}
+    for col in CATEGORICAL_FEATURES:
+        inputs[col] = inputs[col].astype(str).where(inputs[col].notna())
+        counts = inputs[col].iloc[disposed].value_counts()
+        categories[col] = counts.index[:MAX_CATEGORIES].tolist()
+
+    matrix = _encode(inputs, categories)
+
+    rng = np.random.default_rng(seed)
+    held = rng.random(len(disposed)) < HOLDOUT
+    fit_rows, holdout_rows = disposed[~held], disposed[held]
+
+    def fit(**loss):
+        model = HistGradientBoostingRegressor(
+            max_iter=300,
+            learning_rate=0.1,
+            categorical_features=[col in categories for col in FEATURES],
+            random_state=seed,
+            **loss,
+        )
+        return model.fit(matrix[fit_rows], target[fit_rows])
+
+    start = time.perf_counter()
+    artifact = {
+        "format": MODEL_FORMAT,
+        "model": fit(),
+        "interval_models": [fit(loss="quantile", quantile=q) for q in INTERVAL],
+        "interval": INTERVAL,
+        "categories": categories,
+    }
+    fit_seconds = time.perf_counter() - start
+
+    predicted, low, high = _predict_encoded(artifact, matrix[holdout_rows])
+    actual = target[holdout_rows]
+    artifact.update(
+        trained_at=datetime.now().isoformat(timespec="seconds"),
+        n_train=len(fit_rows),
+        n_holdout=len(holdout_rows),
+        holdout_mae=float(np.mean(np.abs(predicted - actual))),
+        holdout_coverage=float(np.mean((actual >= low) & (actual <= high))),
+        fit_seconds=fit_seconds,
+    )
+    return artifact
+
+
+def _predict_encoded(artifact, matrix):
+    predicted = np.round(artifact["model"].predict(matrix), 0)
+    low, high = (np.round(m.predict(matrix), 0) for m in artifact["interval_models"])
+    # Separately fitted quantiles can cross; the interval always holds the point
+    return predicted, np.minimum(low, predicted), np.maximum(high, predicted)
+
+
+def predict(artifact, inputs):
+    """
+    ``(predicted, low, high)`` disposal days for the rows of ``inputs``
+    (see ``model_inputs``): the point estimate and the ``INTERVAL``
+    quantiles, from one encoding of the batch.
+    """
+    inputs = inputs.copy(deep=False)
+    for col in artifact["categories"]:
+        inputs[col] = inputs[col].astype(str).where(inputs[col].notna())
+    return _predict_encoded(artifact, _encode(inputs, artifact["categories"]))
+
+
+# -------------------------------
+# Artifacts
+# -------------------------------
+def _artifact_paths(directory=MODEL_DIR):
+    # Timestamped names sort in training order
+    return sorted(Path(directory).glob(f"disposal_gbr.v{MODEL_FORMAT}.*.joblib"))
+
+
+def save_model(artifact, directory=MODEL_DIR):
+    """Write ``artifact`` next to the previous ones (keeping the newest few)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = artifact["trained_at"].replace("-", "").replace(":", "")
+    path = directory / f"disposal_gbr.v{MODEL_FORMAT}.{stamp}.joblib"
+
+    tmp = path.with_suffix(".tmp")
+    joblib.dump(artifact, tmp)
+    os.replace(tmp, path)
+
+    for old in _artifact_paths(directory)[:-KEEP_MODELS]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return path
+
+
+def latest_model_path(directory=MODEL_DIR):
+    """Newest artifact of the current format, or None."""
+    paths = _artifact_paths(directory)
+    return paths[-1] if paths else None
+
+
+def load_model(path):
+    """The artifact stored at ``path``, or None if it is not of the current format."""
+    artifact = joblib.load(path)
+    return artifact if artifact.get("format") == MODEL_FORMAT else None
+
+
+# -------------------------------
+# Offline training
+# -------------------------------
+if __name__ == "__main__":
+    cases = load_cases()
+    hearing_facts = load_hearing_facts()
+
+    artifact = train(cases, hearing_facts)
+    path = save_model(artifact)
+
+    print(f"Trained on {artifact['n_train']:,} disposed cases in {artifact['fit_seconds']:.1f} s")
+    print(f"Holdout MAE ({artifact['n_holdout']:,} cases): {artifact['holdout_mae']:.1f} days")
+    low, high = artifact["interval"]
+    print(f"Holdout coverage of the {low:.0%}-{high:.0%} interval: {artifact['holdout_coverage']:.1%} "
+          f"(nominal {high - low:.0%})")
+    print(f"Saved {path}")
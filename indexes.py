@@ -0,0 +1,530 @@
+"""
+Lookup indexes over the cleaned NJDG frames.
+
+Indexes map keys to row positions (not labels), so they stay valid for any
+frame that keeps the indexed frame's row order, e.g. a view with extra
+columns or the output of a row-preserving transformation.
+
+Every index is backed by plain numpy arrays (keys as fixed-width bytes), so
+``save_index`` / ``load_index`` can store it on disk and map it back
+read-only in any worker.
+"""
+
+import copy
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dates import parse_date
+from schema import date_format
+
+logger = logging.getLogger(__name__)
+
+
+def _group_offsets(codes, n_groups):
+    """
+    CSR layout of row positions grouped by ``codes`` (-1 = no group):
+    rows of group g are ``order[offsets[g]:offsets[g + 1]]``.
+    """
+    valid = codes >= 0
+    rows = np.flatnonzero(valid)
+    order = rows[np.argsort(codes[valid], kind="stable")]
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    offsets = np.zeros(n_groups + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return order, offsets
+
+
+def _encode(values):
+    """Strings as a fixed-width UTF-8 bytes array (sortable, storable)."""
+    values = pd.Series(np.asarray(values, dtype=object), dtype=object).astype(str)
+    if not len(values):
+        return np.empty(0, dtype="S1")
+    return values.str.encode("utf-8").to_numpy(dtype="S")
+
+
+def _decode(values):
+    return pd.Index([v.decode("utf-8") for v in values], dtype=object)
+
+
+class CnrIndex:
+    """
+    Index from ``cnr_number`` to the row position of a case. Keys are kept
+    sorted as bytes, so a lookup is a binary search and the index can be
+    stored as plain arrays (see ``save_index``). Look cases up in
+    ``Dataset.case_facts`` to get their hearing facts in the same row.
+    """
+
+    def __init__(self, case_cnrs):
+        keys = _encode(case_cnrs)
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._positions = keys[order], order
+        if len(self._keys) > 1 and (self._keys[1:] == self._keys[:-1]).any():
+            raise ValueError("CnrIndex needs unique case CNRs")
+
+    def _positions_of(self, keys):
+        """Case row position per encoded key (-1 when unknown)."""
+        if not len(self._keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        at = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[at] == keys, self._positions[at], -1)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, cnr):
+        return self.position(cnr) is not None
+
+    def position(self, cnr):
+        """Row position of ``cnr`` in the cases frame, or None."""
+        pos = self._positions_of(_encode([str(cnr).strip()]))[0]
+        return None if pos < 0 else int(pos)
+
+    def lookup(self, cases, cnr):
+        """The row of ``cnr`` in ``cases`` as a Series, or None if unknown."""
+        pos = self.position(cnr)
+        if pos is None:
+            return None
+
+        case = cases.iloc[pos]
+        if "cnr_number" in case.index and str(case["cnr_number"]) != str(cnr).strip():
+            # ``cases`` is not row-aligned with this index (e.g. a newer version)
+            return None
+        return case
+
+    def to_arrays(self):
+        return {"keys": self._keys, "positions": self._positions}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        index._keys, index._positions = arrays["keys"], arrays["positions"]
+        return index
+
+
+def _tokens(text):
+    """Upper-case alphanumeric runs of ``text``."""
+    return "".join(ch if ch.isalnum() else " " for ch in str(text).upper()).split()
+
+
+def _codes_and_names(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), pd.Index(values.cat.categories, dtype=object)
+    codes, names = pd.factorize(values)
+    return codes, pd.Index(names, dtype=object)
+
+
+class AdvocateIndex:
+    """
+    Token-based inverted index over advocate name columns.
+
+    Distinct names are tokenized once (token -> names); each name maps to
+    the row positions that carry it in any of the indexed columns. A query
+    narrows the names through the tokens it contains, confirms them with a
+    literal case-insensitive substring match (what ``str.contains`` did over
+    every row) and returns the union of their rows.
+    """
+
+    def __init__(self, frame, columns=("petitioneradvocate", "respondentadvocate")):
+        columns = [c for c in columns if c in frame.columns]
+        self._n_rows = len(frame)
+
+        # One vocabulary of distinct names across all columns
+        per_column = [_codes_and_names(frame[c]) for c in columns]
+        names = pd.Index([], dtype=object)
+        for _, col_names in per_column:
+            names = names.append(col_names)
+        self._names = pd.Index(names.unique(), dtype=object)
+
+        row_ids, name_ids = [], []
+        for codes, col_names in per_column:
+            remap = self._names.get_indexer(col_names)
+            valid = codes >= 0
+            row_ids.append(np.flatnonzero(valid))
+            name_ids.append(remap[codes[valid]])
+        row_ids = np.concatenate(row_ids) if row_ids else np.empty(0, dtype=np.int64)
+        name_ids = np.concatenate(name_ids) if name_ids else np.empty(0, dtype=np.int64)
+
+        order, self._name_offsets = _group_offsets(name_ids, len(self._names))
+        self._name_rows = row_ids[order]
+
+        # token -> ids of the names containing it
+        token_of, name_of = [], []
+        for name_id, name in enumerate(self._names):
+            for token in set(_tokens(name)):
+                token_of.append(token)
+                name_of.append(name_id)
+        token_codes, self._vocabulary = pd.factorize(pd.Series(token_of, dtype=object))
+        self._vocabulary = pd.Series(self._vocabulary, dtype=object)
+        order, self._token_offsets = _group_offsets(token_codes, len(self._vocabulary))
+        self._token_names = np.asarray(name_of, dtype=np.int64)[order]
+
+    def _names_with_token(self, token):
+        """Ids of names having a token that contains ``token``."""
+        hits = np.flatnonzero(self._vocabulary.str.contains(token, regex=False).to_numpy())
+        if not len(hits):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([
+            self._token_names[self._token_offsets[t]:self._token_offsets[t + 1]]
+            for t in hits
+        ]))
+
+    def names(self, query):
+        """Distinct advocate names containing ``query`` (case-insensitive)."""
+        query = str(query)
+        if not query.strip():
+            return pd.Index([], dtype=object)
+
+        candidates = None
+        for token in set(_tokens(query)):
+            ids = self._names_with_token(token)
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids)
+            if not len(candidates):
+                return pd.Index([], dtype=object)
+
+        pool = self._names if candidates is None else self._names[candidates]
+        matched = pool[pool.str.upper().str.contains(query.upper(), regex=False)]
+        return matched
+
+    def rows(self, query):
+        """Sorted row positions whose advocate columns contain ``query``."""
+        ids = self._names.get_indexer(self.names(query))
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        # A row can carry several matching names (petitioner and respondent)
+        hit = np.zeros(self._n_rows, dtype=bool)
+        for i in ids:
+            hit[self._name_rows[self._name_offsets[i]:self._name_offsets[i + 1]]] = True
+        return np.flatnonzero(hit)
+
+    def to_arrays(self):
+        return {
+            "n_rows": np.array([self._n_rows]),
+            "names": _encode(self._names),
+            "name_rows": self._name_rows,
+            "name_offsets": self._name_offsets,
+            "vocabulary": _encode(self._vocabulary),
+            "token_names": self._token_names,
+            "token_offsets": self._token_offsets,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        index._n_rows = int(arrays["n_rows"][0])
+        index._names = _decode(arrays["names"])
+        index._name_rows, index._name_offsets = arrays["name_rows"], arrays["name_offsets"]
+        index._vocabulary = pd.Series(_decode(arrays["vocabulary"]), dtype=object)
+        index._token_names, index._token_offsets = arrays["token_names"], arrays["token_offsets"]
+        return index
+
+
+def _normalize_key(name):
+    """Upper-case ``name`` with runs of whitespace collapsed."""
+    return " ".join(str(name).upper().split())
+
+
+class JudgeIndex:
+    """
+    Partition of row positions by normalized judge name: each judge's rows
+    are one contiguous slice, so resolving a judge is a hash lookup plus a
+    slice, independent of how many other judges there are.
+    """
+
+    def __init__(self, judges):
+        codes, names = _codes_and_names(judges)
+        group_of_name, keys = pd.factorize(pd.Series([_normalize_key(n) for n in names], dtype=object))
+        self._keys = pd.Index(keys, dtype=object)
+
+        groups = np.where(codes >= 0, group_of_name[codes] if len(names) else -1, -1)
+        self._order, self._offsets = _group_offsets(groups, len(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, judge):
+        return len(self.positions(judge)) > 0
+
+    @property
+    def judges(self):
+        """Normalized judge names."""
+        return self._keys
+
+    def positions(self, judge):
+        """Sorted row positions of ``judge``'s cases (empty if unknown)."""
+        try:
+            g = self._keys.get_loc(_normalize_key(judge))
+        except KeyError:
+            return np.empty(0, dtype=np.int64)
+        return self._order[self._offsets[g]:self._offsets[g + 1]]
+
+    def counts(self):
+        """Number of rows per normalized judge name."""
+        return pd.Series(np.diff(self._offsets), index=self._keys)
+
+    def to_arrays(self):
+        return {"keys": _encode(self._keys), "order": self._order, "offsets": self._offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        index._keys = _decode(arrays["keys"])
+        index._order, index._offsets = arrays["order"], arrays["offsets"]
+        return index
+
+
+# -------------------------------
+# Hearing calendar
+# -------------------------------
+# Undated rows get the last day, so they sort after every date and fall
+# outside every bounded range
+_NO_DAY = np.iinfo(np.int32).max
+_FIRST_DAY = np.iinfo(np.int32).min
+
+
+def _day_number(day):
+    """Days since the epoch of a date-like value."""
+    return int(np.datetime64(pd.Timestamp(day).normalize(), "D").astype(np.int64))
+
+
+def _day_numbers(values):
+    """Days since the epoch per value (``_NO_DAY`` where missing)."""
+    dates = np.asarray(values, dtype="datetime64[ns]").astype("datetime64[D]")
+    days = dates.astype(np.int64)
+    days = np.clip(days, _FIRST_DAY + 1, _NO_DAY - 1)
+    days[np.isnat(dates)] = _NO_DAY
+    return days
+
+
+def _sort_keys(groups, days):
+    """One sortable int64 per entry: group in the high word, day in the low word."""
+    return (groups.astype(np.int64) << 32) | (days.astype(np.int64) - _FIRST_DAY)
+
+
+class _DayPartition:
+    """Row positions sorted by (group, day); a group's date range is one slice."""
+
+    def __init__(self, groups, rows, days):
+        keys = _sort_keys(groups, days)
+        order = np.argsort(keys, kind="stable")
+        self._state = (keys[order], rows[order])
+
+    @classmethod
+    def from_state(cls, keys, rows):
+        partition = cls.__new__(cls)
+        partition._state = (keys, rows)
+        return partition
+
+    def range(self, group, start, end):
+        """Rows of ``group`` with ``start <= day < end``."""
+        keys, rows = self._state
+        lo, hi = np.searchsorted(keys, _sort_keys(np.array([group, group]), np.array([start, end])))
+        return rows[lo:hi]
+
+    def replace(self, positions, groups, rows, days):
+        """Drop the entries of ``positions`` and insert the given ones."""
+        keys, old_rows = self._state
+        keep = ~np.isin(old_rows, positions)
+        keys, old_rows = keys[keep], old_rows[keep]
+
+        new_keys = _sort_keys(groups, days)
+        order = np.argsort(new_keys, kind="stable")
+        new_keys, rows = new_keys[order], rows[order]
+
+        at = np.searchsorted(keys, new_keys, side="right")
+        # Swap both arrays at once so concurrent readers see a consistent pair
+        self._state = (np.insert(keys, at, new_keys), np.insert(old_rows, at, rows))
+
+
+class HearingCalendar:
+    """
+    Case rows sorted by one hearing date column, overall and within each
+    judge and each advocate name. Date-range queries are binary searches;
+    ``update`` re-slots changed rows without re-sorting the rest.
+
+    Judges are matched like ``JudgeIndex`` (normalized name); advocates by
+    their exact names, e.g. the ones ``AdvocateIndex.names`` resolves.
+    """
+
+    def __init__(self, facts, column, judge_column=None,
+                 advocate_columns=("petitioneradvocate", "respondentadvocate")):
+        self._column = column
+        self._judge_column = judge_column if judge_column in facts.columns else None
+        self._advocate_columns = [c for c in advocate_columns if c in facts.columns]
+        self._judges = pd.Index([], dtype=object)
+        self._advocates = pd.Index([], dtype=object)
+
+        entries = self._entries(facts, np.arange(len(facts)))
+        self._all, self._by_judge, self._by_advocate = (_DayPartition(*e) for e in entries)
+
+    def _groups(self, attr, values, normalize):
+        """Group code per value, registering unseen names (-1 = missing)."""
+        codes, names = _codes_and_names(values)
+        names = pd.Index([normalize(n) for n in names], dtype=object)
+        keys = getattr(self, attr)
+        unseen = names.difference(keys)
+        if len(unseen):
+            keys = keys.append(unseen)
+            setattr(self, attr, keys)
+        name_groups = keys.get_indexer(names)
+        return np.where(codes >= 0, name_groups[codes] if len(names) else -1, -1)
+
+    def _entries(self, facts, positions):
+        """(groups, rows, days) for the overall, judge and advocate partitions."""
+        rows = np.asarray(positions, dtype=np.int64)
+        if self._column in facts.columns:
+            values = facts[self._column].iloc[rows]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = parse_date(values, date_format(self._column))
+            days = _day_numbers(values)
+        else:
+            days = np.full(len(rows), _NO_DAY, dtype=np.int64)
+
+        overall = (np.zeros(len(rows), dtype=np.int64), rows, days)
+
+        empty = (np.empty(0, dtype=np.int64),) * 3
+        judge = empty
+        if self._judge_column:
+            groups = self._groups("_judges", facts[self._judge_column].iloc[rows], _normalize_key)
+            has = groups >= 0
+            judge = (groups[has], rows[has], days[has])
+
+        parts, seen = [], None
+        for col in self._advocate_columns:
+            groups = self._groups("_advocates", facts[col].iloc[rows], str)
+            has = groups >= 0
+            if seen is not None:
+                has &= groups != seen   # same advocate on both sides
+            parts.append((groups[has], rows[has], days[has]))
+            seen = groups
+        advocate = tuple(np.concatenate(p) for p in zip(*parts)) if parts else empty
+
+        return overall, judge, advocate
+
+    def update(self, facts, positions):
+        """Re-slot the rows at ``positions`` after their dates (or judge/advocates) changed."""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        if not len(positions):
+            return
+        entries = self._entries(facts, positions)
+        for partition, entry in zip((self._all, self._by_judge, self._by_advocate), entries):
+            partition.replace(positions, *entry)
+
+    def updated(self, facts, positions):
+        """A copy with the rows at ``positions`` re-slotted; this calendar is left unchanged."""
+        calendar = copy.copy(self)
+        calendar._all, calendar._by_judge, calendar._by_advocate = (
+            copy.copy(p) for p in (self._all, self._by_judge, self._by_advocate)
+        )
+        calendar.update(facts, positions)
+        return calendar
+
+    def between(self, start=None, end=None, judge=None, advocates=None):
+        """
+        Sorted row positions dated within ``[start, end]`` (whole days; open
+        ends mean any date, undated rows are never included), optionally
+        restricted to a judge and/or any of the given advocate names.
+        """
+        lo = _FIRST_DAY if start is None else _day_number(start)
+        hi = _NO_DAY if end is None else min(_day_number(end) + 1, _NO_DAY)
+
+        found = None
+        if judge is not None:
+            try:
+                found = self._by_judge.range(self._judges.get_loc(_normalize_key(judge)), lo, hi)
+            except KeyError:
+                return np.empty(0, dtype=np.int64)
+
+        if advocates is not None:
+            groups = self._advocates.get_indexer(pd.Index(advocates, dtype=object))
+            slices = [self._by_advocate.range(g, lo, hi) for g in groups[groups >= 0]]
+            rows = np.unique(np.concatenate(slices)) if slices else np.empty(0, dtype=np.int64)
+            found = rows if found is None else np.intersect1d(found, rows)
+
+        if found is None:
+            found = self._all.range(0, lo, hi)
+        return np.sort(found)
+
+    def on(self, day, judge=None, advocates=None):
+        """Sorted row positions dated ``day``."""
+        return self.between(day, day, judge=judge, advocates=advocates)
+
+    def to_arrays(self):
+        arrays = {
+            "column": _encode([self._column]),
+            "judge_column": _encode([self._judge_column or ""]),
+            "advocate_columns": _encode(self._advocate_columns),
+            "judges": _encode(self._judges),
+            "advocates": _encode(self._advocates),
+        }
+        for name, partition in (("all", self._all), ("judge", self._by_judge), ("advocate", self._by_advocate)):
+            arrays[f"{name}_keys"], arrays[f"{name}_rows"] = partition._state
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        calendar = cls.__new__(cls)
+        calendar._column = _decode(arrays["column"])[0]
+        calendar._judge_column = _decode(arrays["judge_column"])[0] or None
+        calendar._advocate_columns = list(_decode(arrays["advocate_columns"]))
+        calendar._judges = _decode(arrays["judges"])
+        calendar._advocates = _decode(arrays["advocates"])
+        calendar._all, calendar._by_judge, calendar._by_advocate = (
+            _DayPartition.from_state(arrays[f"{name}_keys"], arrays[f"{name}_rows"])
+            for name in ("all", "judge", "advocate")
+        )
+        return calendar
+
+
+# -------------------------------
+# Persistence
+# -------------------------------
+# Bump when an index's array names or layout change, so indexes stored by
+# older code are rebuilt instead of being read with the wrong layout
+INDEX_FORMAT = 2
+
+
+def save_index(index, directory):
+    """
+    Store ``index`` as one ``.npy`` file per array in ``directory``.
+    The directory is written under a temporary name and renamed into place,
+    so concurrent workers never see a partial index.
+    """
+    directory = Path(directory)
+    if directory.exists():
+        return directory
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    try:
+        tmp.mkdir(exist_ok=True)
+        for name, values in index.to_arrays().items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(values))
+        os.replace(tmp, directory)
+    except OSError as e:
+        # Another worker got there first, or the disk is read-only
+        logger.debug("Could not store index %s: %s", directory, e)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def load_index(cls, directory):
+    """
+    Index of type ``cls`` stored by ``save_index``, with its arrays mapped
+    read-only: workers share the pages through the OS page cache instead of
+    each holding a copy. Returns None if nothing (or nothing readable by
+    this version of ``cls``) is stored there.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return None
+    try:
+        arrays = {path.stem: np.load(path, mmap_mode="r") for path in directory.glob("*.npy")}
+        return cls.from_arrays(arrays)
+    except (KeyError, ValueError, OSError) as e:
+        logger.warning("Ignoring unreadable index %s: %s", directory, e)
+        return None
@@ -0,0 +1,336 @@
+"""
+Out-of-core and incremental ingestion of the NJDG tables.
+
+``stream_hearing_aggregates`` reads the hearings CSV in bounded chunks,
+cleans each chunk like ``clean_hearings`` (without dropping the hearing
+history) and folds it into running per-case aggregates. The full hearings
+table is never held in memory.
+
+``read_appended`` and ``pending_delta_files`` find rows added since the last
+load (appended to the source CSVs, or dropped as new files into
+``data/deltas/``); the ``upsert_*`` helpers fold cleaned delta rows into
+already-cleaned frames by ``cnr_number``.
+"""
+
+import hashlib
+import io
+from pathlib import Path
+
+import pandas as pd
+
+from preprocessing import BASE_DIR, HEARINGS_PATH, clean_hearings, merge_data
+from schema import normalize_name
+
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_MAX_MEMORY_MB = 1024
+
+# Rows read first to measure the bytes per row before sizing chunks
+PROBE_ROWS = 1000
+
+DELTA_DIR = BASE_DIR / "data" / "deltas"
+TAIL_BYTES = 4096
+
+# Hearing columns whose value at the latest hearing is kept per case
+LAST_VALUE_COLUMNS = {
+    "remappedstages": "last_stage",
+    "beforehonourablejudges": "last_judge",
+    "nexthearingdate": "nexthearingdate",
+    "previoushearing": "previoushearing",
+}
+CATEGORICAL_FACTS = ["last_stage", "last_judge"]
+
+# Raw columns the aggregates need (normalized names)
+STREAM_COLUMNS = {"cnr_number", "businessondate", "purposeoflisting"} | set(LAST_VALUE_COLUMNS)
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def aggregate_hearings(hearings):
+    """
+    Per-case hearing facts from cleaned hearing rows, in one grouped pass:
+    hearing count, first and last business date, number of adjournments,
+    and the stage, judge and next/previous hearing dates recorded at the
+    latest hearing. Partial results combine with ``combine_aggregates``.
+    """
+    rows = pd.DataFrame({"cnr_number": hearings["cnr_number"]})
+    spec = {"hearing_count": ("cnr_number", "size")}
+
+    if "business_on_date" in hearings.columns:
+        rows["business_on_date"] = hearings["business_on_date"]
+        spec["first_hearing"] = ("business_on_date", "min")
+        spec["last_hearing"] = ("business_on_date", "max")
+
+    if "purposeoflisting" in hearings.columns:
+        rows["adjourned"] = hearings["purposeoflisting"].str.contains("adjourn", case=False, na=False)
+        spec["adjournments"] = ("adjourned", "sum")
+
+    for col, fact in LAST_VALUE_COLUMNS.items():
+        if col in hearings.columns:
+            # Per-chunk categories differ; keep plain values until the end
+            rows[fact] = hearings[col].astype(object)
+            spec[fact] = (fact, "last")
+
+    if "business_on_date" in rows.columns:
+        rows = rows.sort_values("business_on_date", kind="stable", na_position="first")
+
+    return rows.groupby("cnr_number", sort=False).agg(**spec)
+
+
+def combine_aggregates(parts):
+    """Merge per-case aggregates computed over disjoint sets of hearings."""
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+
+    df = pd.concat(parts)
+    if "last_hearing" in df.columns:
+        df = df.sort_values("last_hearing", kind="stable", na_position="first")
+
+    spec = {"hearing_count": ("hearing_count", "sum")}
+    if "first_hearing" in df.columns:
+        spec["first_hearing"] = ("first_hearing", "min")
+        spec["last_hearing"] = ("last_hearing", "max")
+    if "adjournments" in df.columns:
+        spec["adjournments"] = ("adjournments", "sum")
+    for fact in LAST_VALUE_COLUMNS.values():
+        if fact in df.columns:
+            spec[fact] = (fact, "last")
+
+    return df.groupby(level=0, sort=False).agg(**spec)
+
+
+def finalize_aggregates(agg):
+    """
+    Turn combined aggregates into the hearing facts table: add the mean gap
+    between hearings and re-encode stage/judge as categoricals.
+    """
+    agg = agg.copy(deep=False)
+    if "first_hearing" in agg.columns:
+        span = (agg["last_hearing"] - agg["first_hearing"]).dt.days
+        gaps = agg["hearing_count"] - 1
+        agg["mean_gap_days"] = (span / gaps.where(gaps > 0)).astype("float32")
+    for fact in CATEGORICAL_FACTS:
+        if fact in agg.columns:
+            agg[fact] = agg[fact].astype("category")
+    return agg
+
+
+def stream_hearing_aggregates(path=HEARINGS_PATH, chunk_size=DEFAULT_CHUNK_SIZE,
+                              max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    """
+    Stream the hearings CSV and return the per-case hearing facts (see
+    ``aggregate_hearings``) indexed by ``cnr_number``.
+
+    ``max_memory_mb`` bounds the data held at any time: the raw and cleaned
+    current chunk, the running aggregates, and the copy made while merging
+    them. A small probe chunk measures the bytes per row, and every later
+    chunk is sized to fit the budget; if the aggregates alone outgrow it a
+    ``MemoryError`` is raised.
+    """
+    budget = max_memory_mb * 1024 ** 2
+    reader = pd.read_csv(
+        path,
+        usecols=lambda c: normalize_name(c) in STREAM_COLUMNS,
+        iterator=True,
+    )
+
+    state, pending, pending_rows = None, [], 0
+    rows = min(chunk_size, PROBE_ROWS)
+
+    try:
+        while True:
+            try:
+                raw = reader.get_chunk(rows)
+            except StopIteration:
+                break
+
+            # The raw chunk is alive while its cleaned copy is built
+            raw_bytes = _frame_bytes(raw)
+            chunk = clean_hearings(raw, dedupe=False)
+            chunk_bytes = _frame_bytes(chunk)
+            n_rows = len(raw)
+            del raw
+
+            pending.append(aggregate_hearings(chunk))
+            pending_rows += len(pending[-1])
+
+            aggregate_bytes = sum(_frame_bytes(p) for p in pending)
+            aggregate_bytes += 0 if state is None else _frame_bytes(state)
+            held = raw_bytes + chunk_bytes + aggregate_bytes
+
+            # Fold pending partials in once they are as large as the state,
+            # so total merge work stays linear in the number of hearings
+            state_rows = 0 if state is None else len(state)
+            fold = pending_rows >= max(state_rows, rows)
+            if fold:
+                # ``combine_aggregates`` concatenates state and partials
+                held += aggregate_bytes
+            if held > budget:
+                raise MemoryError(
+                    f"Hearing aggregates need {held / 1024 ** 2:.1f} MB, "
+                    f"over max_memory_mb={max_memory_mb}"
+                )
+            if fold:
+                state = combine_aggregates([state] + pending)
+                pending, pending_rows = [], 0
+
+            # Let a chunk (raw plus cleaned) use at most a quarter of the budget
+            per_row = max((raw_bytes + chunk_bytes) / max(n_rows, 1), 1)
+            rows = max(PROBE_ROWS, min(chunk_size, int(budget / 4 / per_row)))
+            del chunk
+    finally:
+        reader.close()
+
+    state = combine_aggregates([state] + pending)
+    if state is None:
+        return finalize_aggregates(aggregate_hearings(pd.DataFrame({"cnr_number": pd.Series(dtype=object)})))
+
+    return finalize_aggregates(state)
+
+
+# -------------------------------
+# Incremental (delta) ingestion
+# -------------------------------
+def _tail_hash(path, end):
+    """Hash of the first and last TAIL_BYTES before ``end``, and whether
+    the data up to ``end`` ends on a complete line."""
+    start = max(0, end - TAIL_BYTES)
+    with open(path, "rb") as f:
+        head = f.read(min(TAIL_BYTES, end))
+        f.seek(start)
+        tail = f.read(end - start)
+    return hashlib.sha1(head + tail).hexdigest(), tail.endswith(b"\n") or end == 0
+
+
+def watermark(path):
+    """Where ingestion of ``path`` stands: its size and a hash of its ends."""
+    size = Path(path).stat().st_size
+    tail, complete = _tail_hash(path, size)
+    return {"size": size, "tail": tail, "complete": complete}
+
+
+def read_appended(path, mark):
+    """
+    Rows appended to ``path`` since ``mark`` was taken.
+
+    Returns ``(rows, new_mark)``. ``rows`` is empty when nothing was added
+    and None when the file was rewritten rather than appended to (the
+    caller must reload it fully); rewrites are detected from the size and
+    the bytes at both ends of the old content. A trailing partial line is left for the
+    next call.
+    """
+    size = Path(path).stat().st_size
+    if size < mark["size"] or _tail_hash(path, mark["size"])[0] != mark["tail"]:
+        return None, mark
+    if size == mark["size"]:
+        return pd.DataFrame(), mark
+    if not mark["complete"]:
+        return None, mark
+
+    with open(path, "rb") as f:
+        f.seek(mark["size"])
+        data = f.read(size - mark["size"])
+    data = data[:data.rfind(b"\n") + 1]
+    if not data.strip():
+        return pd.DataFrame(), mark
+
+    header = pd.read_csv(path, nrows=0).columns
+    rows = pd.read_csv(io.BytesIO(data), header=None, names=header)
+
+    end = mark["size"] + len(data)
+    return rows, {"size": end, "tail": _tail_hash(path, end)[0], "complete": True}
+
+
+def pending_delta_files(applied):
+    """
+    Delta files in ``data/deltas/`` not yet in ``applied``, oldest name
+    first, as ``(kind, path)`` with kind "cases" or "hearings".
+    """
+    if not DELTA_DIR.exists():
+        return []
+
+    found = []
+    for path in sorted(DELTA_DIR.glob("*.csv")):
+        name = path.name.lower()
+        if path.name in applied:
+            continue
+        if name.startswith("cases"):
+            found.append(("cases", path))
+        elif name.startswith("hear"):
+            found.append(("hearings", path))
+    return found
+
+
+def concat_rows(frame, rows, ignore_index=True):
+    """Append ``rows`` to ``frame`` without turning categoricals into objects."""
+    if rows is None or rows.empty:
+        return frame
+
+    frame, rows = frame.copy(deep=False), rows.copy(deep=False)
+    for col in frame.columns.intersection(rows.columns):
+        if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+            continue
+        incoming = rows[col].dropna().unique()
+        new = pd.Index(incoming).difference(frame[col].cat.categories)
+        if len(new):
+            frame[col] = frame[col].cat.add_categories(new)
+        rows[col] = rows[col].astype(frame[col].dtype)
+
+    return pd.concat([frame, rows], ignore_index=ignore_index)
+
+
+def upsert_cases(cases, delta):
+    """Insert or replace cleaned case rows by ``cnr_number`` (last one wins)."""
+    delta = delta.drop_duplicates(subset="cnr_number", keep="last")
+    kept = cases[~cases["cnr_number"].isin(delta["cnr_number"])]
+    return concat_rows(kept, delta)
+
+
+def upsert_hearings(hearings, rows):
+    """
+    Add cleaned hearing rows to the per-case hearings frame, which keeps
+    the first hearing seen for each ``cnr_number``.
+    """
+    first = rows.drop_duplicates(subset="cnr_number")
+    new = first[~first["cnr_number"].isin(hearings["cnr_number"])]
+    return concat_rows(hearings, new), new
+
+
+def upsert_hearing_facts(facts, rows):
+    """Fold cleaned hearing rows into the per-case hearing facts."""
+    delta = aggregate_hearings(rows)
+    touched = facts.index.intersection(delta.index)
+
+    previous = facts.loc[touched].drop(columns="mean_gap_days", errors="ignore")
+    for fact in CATEGORICAL_FACTS:
+        if fact in previous.columns:
+            previous[fact] = previous[fact].astype(object)
+
+    combined = finalize_aggregates(combine_aggregates([previous, delta]))
+    return concat_rows(facts.drop(index=touched), combined, ignore_index=False)
+
+
+def upsert_merged(merged, cases, hearings, cnrs):
+    """Recompute the merged rows of the given CNRs."""
+    if not len(cnrs):
+        return merged
+    kept = merged[~merged["cnr_number"].isin(cnrs)]
+    fresh = merge_data(cases, hearings[hearings["cnr_number"].isin(cnrs)])
+    return concat_rows(kept, fresh)
+
+
+# -------------------------------
+# Example usage
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MAX_MEMORY_MB
+    aggregates = stream_hearing_aggregates(max_memory_mb=budget)
+
+    print(aggregates.head())
+    print(f"Cases with hearings: {len(aggregates)}")
@@ -1,45 +1,43 @@
 import streamlit as st
 import pandas as pd
-from preprocessing import load_data, clean_cases
+from components.charts import line_chart
+from dataset import get_cases, get_dataset, get_model_predictions
+from predictions import prediction_errors
 
 st.title("ML Predictions")
 
-# Load and clean data
-cases, hearings = load_data()
-cases = clean_cases(cases)
+# Load data (only the columns used here)
+dataset = get_dataset()
+cases = get_cases(["cnr_number", "disposal_days", "total_hearings", "filing_year"], dataset)
 
 # Show available columns for debugging
 # st.write("Available columns in cases:", cases.columns.tolist())
 
-# Defensive checks for required columns
-required_cols = ["cnr_number", "disposal_days", "total_hearings", "filing_year"]
-missing = [col for col in required_cols if col not in cases.columns]
+# Trained model, scored once per dataset version (see disposal_model.py)
+artifact, scores = get_model_predictions(dataset)
 
-if missing:
-    st.error(f"Missing columns in cases DataFrame: {missing}")
+if artifact is None:
+    st.info("No trained model found. Run `python disposal_model.py` to train one.")
 else:
-    # Interactive sliders for rule parameters
-    hearing_weight = st.slider("Days per hearing", 10, 50, 20)
-    year_weight = st.slider("Year effect (days)", 5, 30, 10)
-    baseline = st.slider("Baseline days", 50, 200, 100)
-
-    # Rule-based prediction
-    cases["predicted_disposal"] = (
-        cases["total_hearings"] * hearing_weight +
-        (cases["filing_year"] - cases["filing_year"].min()) * year_weight +
-        baseline
+    st.caption(
+        f"Gradient-boosted trees trained {artifact['trained_at']} on "
+        f"{artifact['n_train']:,} disposed cases"
     )
+    cases["predicted_disposal"] = scores["predicted_disposal"].to_numpy()
 
-    st.subheader("Disposal Time Predictions (Rule-Based)")
+    st.subheader("Disposal Time Predictions (Trained Model)")
     st.write(
         cases[["cnr_number", "total_hearings", "disposal_days", "predicted_disposal"]]
         .head(20)
     )
 
-    # Line chart comparison
-    st.line_chart(cases[["disposal_days", "predicted_disposal"]])
+    # Line chart comparison (downsampled, see components/charts.py)
+    line_chart(
+        cases,
+        ["disposal_days", "predicted_disposal"],
+        cache_key=(dataset.version, artifact["trained_at"]),
+    )
 
     # Add simple evaluation metric
-    from sklearn.metrics import mean_absolute_error
-    mae = mean_absolute_error(cases["disposal_days"], cases["predicted_disposal"])
-    st.success(f"Mean Absolute Error: {mae:.2f} days")
\ No newline at end of file
+    mae, _ = prediction_errors(cases["predicted_disposal"], cases["disposal_days"])
+    st.success(f"Mean Absolute Error: {mae:.2f} days (holdout: {artifact['holdout_mae']:.2f} days)")
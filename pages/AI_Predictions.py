@@ -1,11 +1,12 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.metrics import mean_absolute_error
 
-from preprocessing import load_data, clean_cases
+from components.case_search import case_search_input
+from components.charts import line_chart
+from dataset import get_cases, get_cnr_index, get_dataset, get_linear_predictor, get_model_predictions
 from helpers.sidebar import render_sidebar
+from predictions import classify_delay_risk, detect_bottlenecks, fixed_bands, prediction_errors
 from components.language import render_language_header
+from components.table import paginated_table
 
 # --------------------------------------------------
 # Page Config
@@ -33,16 +34,8 @@ st.markdown("""
 st.title("AI-Assisted Disposal Time Predictions")
 
 # --------------------------------------------------
-# Load & Clean Data (Cached)
+# Load Data (only the columns this page uses)
 # --------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_cases():
-    cases, _ = load_data()
-    cases = clean_cases(cases)
-    return cases
-
-cases = load_cases()
-
 REQUIRED_COLS = [
     "cnr_number",
     "disposal_days",
@@ -50,85 +43,78 @@ REQUIRED_COLS = [
     "filing_year",
 ]
 
+dataset = get_dataset()   # one version for every helper below, so rows line up
+cases = get_cases(REQUIRED_COLS, dataset)
+predictor = get_linear_predictor(dataset)
+cnr_index = get_cnr_index(dataset)   # row positions survive the steps below
+
 missing = [c for c in REQUIRED_COLS if c not in cases.columns]
 if missing:
     st.error(f"Missing required columns: {missing}")
     st.stop()
 
-min_year = cases["filing_year"].min()
+min_year = predictor.min_year
 
 # --------------------------------------------------
 # Prediction Controls
 # --------------------------------------------------
-with st.expander("Prediction Parameters", expanded=True):
-    c1, c2, c3 = st.columns(3)
-    with c1:
-        hearing_weight = st.slider("Days added per hearing", 10, 50, 20)
-    with c2:
-        year_weight = st.slider("Backlog impact per year", 5, 30, 10)
-    with c3:
-        baseline_delay = st.slider("Baseline court delay (days)", 50, 200, 100)
-
-# --------------------------------------------------
-# Prediction Engine (Cached)
-# --------------------------------------------------
-@st.cache_data(show_spinner=False)
-def generate_predictions(df, hearing_weight, year_weight, baseline_delay, min_year):
-    data = df.copy()
-
-    data["hearing_component"] = data["total_hearings"] * hearing_weight
-    data["year_component"] = (data["filing_year"] - min_year) * year_weight
-    data["baseline_component"] = baseline_delay
-
-    data["predicted_disposal"] = (
-        data["hearing_component"]
-        + data["year_component"]
-        + data["baseline_component"]
-    ).round(0)
-
-    data["best_case_days"] = (data["predicted_disposal"] * 0.8).round(0)
-    data["worst_case_days"] = (data["predicted_disposal"] * 1.25).round(0)
-
-    return data
-
-cases = generate_predictions(
-    cases,
-    hearing_weight,
-    year_weight,
-    baseline_delay,
-    min_year,
-)
+# The trained model (see disposal_model.py) is only loaded and batch-scored
+# here, once per dataset version; training runs offline
+artifact, scores = get_model_predictions(dataset)
+sources = (["Trained model"] if artifact is not None else []) + ["Rule-based"]
+source = st.radio("Prediction source", sources, horizontal=True)
+
+if source == "Trained model":
+    st.caption(
+        f"Gradient-boosted trees trained {artifact['trained_at']} on "
+        f"{artifact['n_train']:,} disposed cases (holdout MAE {artifact['holdout_mae']:.1f} days). "
+        f"Best/worst case is the {artifact['interval'][0]:.0%}–{artifact['interval'][1]:.0%} "
+        f"quantile interval, covering {artifact['holdout_coverage']:.0%} of holdout cases."
+    )
+else:
+    if artifact is None:
+        st.caption("No trained model yet: run `python disposal_model.py` to train one.")
+    with st.expander("Prediction Parameters", expanded=True):
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            hearing_weight = st.slider("Days added per hearing", 10, 50, 20)
+        with c2:
+            year_weight = st.slider("Backlog impact per year", 5, 30, 10)
+        with c3:
+            baseline_delay = st.slider("Baseline court delay (days)", 50, 200, 100)
+
+# --------------------------------------------------
+# Prediction Engine
+# --------------------------------------------------
+if source == "Trained model":
+    # Point estimates and interval bounds come precomputed per dataset version
+    for col in scores.columns:
+        cases[col] = scores[col].to_numpy()
+    mae, mape = prediction_errors(cases["predicted_disposal"], cases["disposal_days"])
+    avg_predicted = cases["predicted_disposal"].mean()
+    low_th, high_th = cases["predicted_disposal"].quantile([0.33, 0.66])
+    chart_key = (dataset.version, artifact["trained_at"])
+else:
+    # Slider changes only redo arithmetic over the stored vectors
+    weights = (hearing_weight, year_weight, baseline_delay)
+    cases["predicted_disposal"] = predictor.predict(*weights)
+    mae, mape = predictor.errors(*weights)
+    avg_predicted = predictor.mean(*weights)
+    low_th, high_th = predictor.quantile([0.33, 0.66], *weights)
+    chart_key = (dataset.version, *weights)
+    cases["best_case_days"], cases["worst_case_days"] = fixed_bands(cases["predicted_disposal"])
 
 # --------------------------------------------------
 # Risk Classification (Data-Driven)
 # --------------------------------------------------
-low_th = cases["predicted_disposal"].quantile(0.33)
-high_th = cases["predicted_disposal"].quantile(0.66)
-
-def delay_risk(days):
-    if days <= low_th:
-        return "Low"
-    elif days <= high_th:
-        return "Medium"
-    return "High"
-
-cases["delay_risk"] = cases["predicted_disposal"].apply(delay_risk)
+cases["delay_risk"] = classify_delay_risk(cases["predicted_disposal"], low_th, high_th)
 
 # --------------------------------------------------
 # Bottleneck Detection
 # --------------------------------------------------
-def detect_bottleneck(row):
-    reasons = []
-
-    if row["total_hearings"] >= 8:
-        reasons.append("High hearings")
-
-    if row["filing_year"] <= min_year + 1:
-        reasons.append("Old backlog")
-
-    return " & ".join(reasons) if reasons else "Normal flow"
-
-cases["primary_bottleneck"] = cases.apply(detect_bottleneck, axis=1)
+cases["primary_bottleneck"] = detect_bottlenecks(
+    cases["total_hearings"], cases["filing_year"], min_year
+)
 
 # --------------------------------------------------
 # Tabs Layout
@@ -149,25 +135,11 @@ with tab1:
     This module provides **transparent, explainable predictions**
     for estimating judicial case disposal timelines.
 
-    • Rule-based  
-    • No black-box ML  
+    • Trained on historical disposals, or rule-based  
+    • Every prediction comes with its inputs  
     • Safe for judicial decision support  
     """)
 
-    mae = mean_absolute_error(
-        cases["disposal_days"],
-        cases["predicted_disposal"],
-    )
-
-    mape = (
-        np.mean(
-            np.abs(
-                (cases["disposal_days"] - cases["predicted_disposal"])
-                / cases["disposal_days"]
-            )
-        ) * 100
-    )
-
     c1, c2 = st.columns(2)
     c1.metric("Mean Absolute Error", f"{mae:.1f} days")
     c2.metric("Mean Absolute % Error", f"{mape:.1f}%")
@@ -204,10 +176,12 @@ with tab2:
             return "background-color:#fef9c3"
         return "background-color:#dcfce7"
 
-    st.dataframe(
-        filtered[display_cols]
-        .style.applymap(risk_color, subset=["delay_risk"]),
-        use_container_width=True,
+    # Only the visible page is styled and sent to the browser
+    paginated_table(
+        filtered,
+        key="predictions",
+        columns=display_cols,
+        style=lambda styler: styler.map(risk_color, subset=["delay_risk"]),
     )
 
 # --------------------------------------------------
@@ -216,21 +190,29 @@ with tab2:
 with tab3:
     st.subheader("Explain Prediction for a Specific Case")
 
-    cnr = st.text_input("Enter CNR Number")
+    cnr = case_search_input("Enter CNR Number", key="explain_cnr", dataset=dataset)
 
     if cnr:
-        row = cases[cases["cnr_number"] == cnr]
+        r = cnr_index.lookup(cases, cnr)
 
-        if row.empty:
+        if r is None:
             st.warning("Case not found.")
         else:
-            r = row.iloc[0]
 
             st.markdown("### Prediction Breakdown")
-            st.write(f"""
-            **Hearings impact:** {int(r.hearing_component)} days  
-            **Backlog impact:** {int(r.year_component)} days  
-            **Baseline delay:** {int(r.baseline_component)} days  
+            if source == "Trained model":
+                inputs = f"""
+            **Hearings so far:** {r.total_hearings}  
+            **Filing year:** {r.filing_year}  
+            **Model:** trained {artifact['trained_at']}  
+"""
+            else:
+                inputs = f"""
+            **Hearings impact:** {int(r.total_hearings * hearing_weight)} days  
+            **Backlog impact:** {int((r.filing_year - min_year) * year_weight)} days  
+            **Baseline delay:** {int(baseline_delay)} days  
+"""
+            st.write(inputs + f"""
 
             **Expected disposal:** {int(r.predicted_disposal)} days  
             **Best case:** {int(r.best_case_days)} days  
@@ -249,7 +231,7 @@ with tab4:
     c1, c2, c3 = st.columns(3)
     c1.metric(
         "Avg Predicted Disposal",
-        f"{int(cases['predicted_disposal'].mean())} days",
+        f"{int(avg_predicted)} days",
     )
     c2.metric(
         "High Risk Cases",
@@ -261,4 +243,8 @@ with tab4:
     )
 
     st.subheader("Actual vs Predicted Trend")
-    st.line_chart(cases[["disposal_days", "predicted_disposal"]])
+    line_chart(
+        cases,
+        ["disposal_days", "predicted_disposal"],
+        cache_key=chart_key,
+    )
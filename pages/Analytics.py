@@ -2,7 +2,8 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from aggregates import mean_disposal_days, metric_histogram, rollup, slice_cube
+from dataset import get_dataset
 from helpers.sidebar import render_sidebar
 from components.language import render_language_header
 
@@ -32,24 +33,17 @@ st.markdown("""
 st.title("Judicial Analytics Dashboard")
 
 # --------------------------------------------------
-# Load & Preprocess Data (CACHED)
+# Load Data (shared, read-only views)
 # --------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_all_data():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged = merge_data(cases, hearings)
-    return cases, hearings, merged
-
-cases, hearings, merged = load_all_data()
+dataset = get_dataset()
+cube = dataset.case_cube   # filing year x stage x judge x status cells
 
 # --------------------------------------------------
 # Sidebar Filters
 # --------------------------------------------------
 st.sidebar.header("Filters")
 
-years = sorted(cases["filing_year"].dropna().unique())
+years = sorted(cube["filing_year"].dropna().unique())
 
 selected_years = st.sidebar.multiselect(
     "Select Filing Years",
@@ -57,32 +51,17 @@ selected_years = st.sidebar.multiselect(
     default=years,
 )
 
-def filter_by_year(df, col="filing_year"):
-    if selected_years and col in df.columns:
-        return df[df[col].isin(selected_years)]
-    return df
-
-filtered_cases = filter_by_year(cases)
-filtered_merged = filter_by_year(merged)
-
-# Attach filing year to hearings
-if {"case_id", "filing_year"}.issubset(cases.columns) and "case_id" in hearings.columns:
-    hearings_with_year = hearings.merge(
-        cases[["case_id", "filing_year"]],
-        on="case_id",
-        how="left",
-    )
-    filtered_hearings = filter_by_year(hearings_with_year)
-else:
-    filtered_hearings = hearings
+# Every metric and chart below sums cells of the selected years
+selected = slice_cube(cube, selected_years)
 
 # --------------------------------------------------
 # High-Level Metrics
 # --------------------------------------------------
-total_cases = len(filtered_cases)
-disposed_cases = filtered_cases["disposal_days"].gt(0).sum()
+totals = rollup(selected)
+total_cases = int(totals["cases"])
+disposed_cases = int(totals["disposed"])
 pending_cases = total_cases - disposed_cases
-older_than_1yr = filtered_cases["disposal_days"].gt(365).sum()
+older_than_1yr = int(totals["over_1yr"])
 
 case_clearance_rate = (
     disposed_cases / total_cases * 100 if total_cases > 0 else 0
@@ -118,13 +97,14 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.subheader("Case Progress Funnel")
 
-    if "remappedstages" in filtered_merged.columns:
+    stage_counts = rollup(selected, "stage")["cases"]
+    if len(stage_counts):
+        # Current stage of each case (stage at its latest hearing)
         funnel_df = (
-            filtered_merged["remappedstages"]
-            .value_counts()
+            stage_counts[stage_counts > 0]
+            .sort_values(ascending=False)
             .reset_index()
         )
-        # 🔥 CRITICAL FIX
         funnel_df.columns = ["Stage", "Count"]
 
         fig = px.funnel(
@@ -144,17 +124,10 @@ with tab1:
 with tab2:
     st.subheader("Average Disposal Time by Filing Year")
 
-    if {"filing_year", "disposal_days"}.issubset(filtered_cases.columns):
-        trend_df = filtered_cases.copy()
-        trend_df["filing_year"] = trend_df["filing_year"].astype(int)
-
-        trend = (
-            trend_df
-            .groupby("filing_year", as_index=False)["disposal_days"]
-            .mean()
-        )
-
-        trend["filing_year"] = trend["filing_year"].astype(str)
+    by_year = rollup(selected, "filing_year")
+    if by_year["disposal_days_count"].sum() > 0:
+        trend = mean_disposal_days(by_year).rename("disposal_days").reset_index()
+        trend["filing_year"] = trend["filing_year"].astype(int).astype(str)
 
         fig = px.line(
             trend,
@@ -175,22 +148,14 @@ with tab2:
 with tab3:
     st.subheader("Judge Hearing Workload")
 
-    judge_columns = [
-        "before_honourable_judges",
-        "before_hon_judge",
-        "njdg_judge_name",
-    ]
+    judge_hearings = rollup(selected, "judge")["hearings"]
 
-    judge_col = next(
-        (col for col in judge_columns if col in filtered_hearings.columns),
-        None,
-    )
-
-    if judge_col:
+    if judge_hearings.sum() > 0:
+        # Hearings of the cases each judge heard last
         judge_df = (
-            filtered_hearings[judge_col]
-            .value_counts()
-            .head(15)
+            judge_hearings
+            .nlargest(15)
+            .astype(int)
             .reset_index()
         )
         judge_df.columns = ["Judge", "Hearings"]
@@ -214,13 +179,20 @@ with tab3:
 with tab4:
     st.subheader("Distribution of Disposal Days")
 
-    if "disposal_days" in filtered_cases.columns:
-        fig = px.histogram(
-            filtered_cases,
+    # 40 precomputed bins instead of every case's value
+    hist = metric_histogram(
+        dataset.value_summaries, "disposal_days", bins=40, years=selected_years
+    )
+    if len(hist):
+        hist["disposal_days"] = (hist["bin_start"] + hist["bin_end"]) / 2
+        fig = px.bar(
+            hist,
             x="disposal_days",
-            nbins=40,
+            y="count",
+            hover_data=["bin_start", "bin_end"],
             title="Disposal Time Distribution",
         )
+        fig.update_layout(bargap=0)
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Disposal days column not found.")
@@ -231,23 +203,11 @@ with tab4:
 with tab5:
     st.subheader("Case Clearance Rate by Filing Year")
 
-    unique_case_id = "cnr_number"
-
-    if {"filing_year", unique_case_id}.issubset(filtered_cases.columns):
-        ccr_df = (
-            filtered_cases
-            .assign(disposed=lambda x: x["disposal_days"].gt(0))
-            .groupby("filing_year", as_index=False)
-            .agg(
-                total_cases=(unique_case_id, "count"),
-                disposed_cases=("disposed", "sum"),
-            )
-        )
+    ccr_df = rollup(selected, "filing_year")[["cases", "disposed"]].reset_index()
 
-        ccr_df["CCR (%)"] = (
-            ccr_df["disposed_cases"] / ccr_df["total_cases"] * 100
-        )
-        ccr_df["filing_year"] = ccr_df["filing_year"].astype(str)
+    if len(ccr_df):
+        ccr_df["CCR (%)"] = ccr_df["disposed"] / ccr_df["cases"] * 100
+        ccr_df["filing_year"] = ccr_df["filing_year"].astype(int).astype(str)
 
         fig = px.line(
             ccr_df,
@@ -3,8 +3,10 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from pathlib import Path
+from snapshot import read_table
 from helpers.sidebar import render_sidebar
 from components.language import render_language_header
+from components.table import paginated_table
 # ----------------------------------------------------
 # PAGE CONFIG
 # ----------------------------------------------------
@@ -26,8 +28,8 @@ def load_data():
     cases_path = Path(__file__).parent.parent / "data/ISDMHack_Cases_students.csv"
     hearings_path = Path(__file__).parent.parent / "data/ISDMHack_Hear_students.csv"
 
-    cases = pd.read_csv(cases_path)
-    hearings = pd.read_csv(hearings_path)
+    cases = read_table(cases_path)
+    hearings = read_table(hearings_path)
 
     return cases, hearings
 
@@ -112,19 +114,24 @@ def explain_anomalies(df: pd.DataFrame) -> pd.DataFrame:
     reasons = []
     severity = []
 
+    # Thresholds over the rows being labelled, computed once (not per row)
+    duration_th = df["case_duration"].quantile(0.90)
+    hearings_th = df.get("total_hearings", pd.Series()).quantile(0.95)
+    disposal_th = df.get("disposal_days", pd.Series()).quantile(0.95)
+
     for _, row in df.iterrows():
         r = []
         s = "Low"
 
-        if row.get("case_duration", 0) > df["case_duration"].quantile(0.90):
+        if row.get("case_duration", 0) > duration_th:
             r.append("Unusually long case duration")
             s = "High"
 
-        if row.get("total_hearings", 0) > df.get("total_hearings", pd.Series()).quantile(0.95):
+        if row.get("total_hearings", 0) > hearings_th:
             r.append("Excessive number of hearings")
             s = "Critical"
 
-        if row.get("disposal_days", 0) > df.get("disposal_days", pd.Series()).quantile(0.95):
+        if row.get("disposal_days", 0) > disposal_th:
             r.append("Abnormally high disposal days")
 
         reasons.append(", ".join(r) if r else "Statistical outlier pattern")
@@ -193,9 +200,10 @@ def run_dashboard():
         ]
 
         if display_cols:
-            st.dataframe(
-                anomalies[display_cols],
-                use_container_width=True
+            paginated_table(
+                anomalies,
+                key="anomalies",
+                columns=display_cols,
             )
         else:
             st.warning("No displayable columns found.")
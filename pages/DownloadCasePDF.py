@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import tempfile
 import os
 import io
@@ -16,7 +17,8 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 
-from preprocessing import load_data, clean_cases
+from components.case_search import case_search_input
+from dataset import get_cnr_index, get_dataset
 from helpers.sidebar import render_sidebar
 
 # ------------------ PAGE CONFIG ------------------
@@ -30,26 +32,23 @@ render_sidebar()
 st.title("Case Information Download")
 
 # ------------------ LOAD DATA ------------------
-@st.cache_data(show_spinner=False)
-def load_cases():
-    cases, _ = load_data()
-    return clean_cases(cases)
-
-cases = load_cases()
+dataset = get_dataset()   # one version for both, so positions match
+cases = dataset.case_facts   # each case with its hearing facts
+cnr_index = get_cnr_index(dataset)
 if "cnr_number" not in cases.columns:
     st.error("CNR Number column not found")
     st.stop()
 
 # ------------------ SELECT CASE ------------------
 st.subheader("Select Case")
-case_number = st.text_input("Enter Case Number")
+case_number = case_search_input("Enter Case Number", key="pdf_case", dataset=dataset)
 
 if st.button("Search Case"):
-    filtered = cases[cases["cnr_number"] == case_number]
-    if filtered.empty:
+    found = cnr_index.lookup(cases, case_number)
+    if found is None:
         st.error("No case found")
         st.stop()
-    st.session_state.case = filtered.iloc[0]
+    st.session_state.case = found
 
 # ------------------ PDF GENERATOR ------------------
 def generate_case_pdf(row):
@@ -81,8 +80,11 @@ def generate_case_pdf(row):
         ["Filing Year", row.get("filing_year", "N/A")],
         ["Total Hearings", row.get("total_hearings", "N/A")],
         ["Status", "Disposed" if row.get("disposal_days", 0) > 0 else "Pending"],
-        ["Advocate", row.get("PetitionerAdvocate", "N/A")],
-        ["Presiding Judge", row.get("Njdg_Judge_Name", "N/A")],
+        ["Advocate", row.get("petitioneradvocate", "N/A")],
+        ["Presiding Judge", row.get("njdg_judge_name", "N/A")],
+        ["Hearings on Record", int(row["hearing_count"]) if pd.notna(row.get("hearing_count")) else 0],
+        ["Last Hearing", str(row["last_hearing"].date()) if pd.notna(row.get("last_hearing")) else "N/A"],
+        ["Current Stage", row["last_stage"] if pd.notna(row.get("last_stage")) else "N/A"],
     ]
     table = Table(data, colWidths=[180, 320])
     table.setStyle(
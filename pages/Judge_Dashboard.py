@@ -5,7 +5,8 @@ import plotly.express as px
 from streamlit_cookies_manager import EncryptedCookieManager
 
 from components.language import render_language_header
-from preprocessing import load_data, clean_cases, clean_hearings
+from components.table import paginated_table
+from dataset import get_dataset
 from helpers.sidebar import render_sidebar
 from sessions import validate_token
 
@@ -42,76 +43,49 @@ if not st.session_state.get("authenticated"):
 render_sidebar()
 
 # -------------------------------------------------
-# LOAD + MERGE DATA
+# LOAD DATA (shared, read-only view: one row per case)
 # -------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_all_data():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
+dataset = get_dataset()
 
-    cases.columns = cases.columns.str.lower().str.strip()
-    hearings.columns = hearings.columns.str.lower().str.strip()
-
-    case_keys = ["combined_case_number", "cnr_number", "case_number"]
-    hearing_keys = ["combinedcasenumber", "cnr_number", "case_number"]
-
-    left_key = next((k for k in case_keys if k in cases.columns), None)
-    right_key = next((k for k in hearing_keys if k in hearings.columns), None)
-
-    if not left_key or not right_key:
-        st.error("No common case ID found")
-        st.stop()
-
-    merged = pd.merge(
-        cases,
-        hearings,
-        left_on=left_key,
-        right_on=right_key,
-        how="left",
-        suffixes=("_case", "_hear")
-    )
+# -------------------------------------------------
+# JUDGE CONTEXT
+# -------------------------------------------------
+judge = st.session_state.user_name
 
-    merged["judge"] = merged.get(
-        "beforehonourablejudges",
-        merged.get("njdg_judge_name", "UNKNOWN")
-    )
+# Only this judge's docket (judge at the latest hearing, see Dataset.judge_index)
+judge_positions = dataset.judge_index.positions(judge)
+judge_cases = dataset.case_facts.iloc[judge_positions]
 
-    return merged
+if judge_cases.empty:
+    st.warning(f"No cases found for Judge: {judge}")
+    st.stop()
 
-df = load_all_data()
+judge_cases["judge"] = judge_cases.get(
+    "last_judge",
+    judge_cases.get("njdg_judge_name", "UNKNOWN")
+)
 
 # -------------------------------------------------
 # SCORES
 # -------------------------------------------------
 today = pd.Timestamp.today()
-df["date_filed"] = pd.to_datetime(df.get("date_filed"), errors="coerce")
-df["age_days"] = (today - df["date_filed"]).dt.days.fillna(0)
+judge_cases["date_filed"] = pd.to_datetime(judge_cases.get("date_filed"), errors="coerce")
+judge_cases["age_days"] = (today - judge_cases["date_filed"]).dt.days.fillna(0)
 
-df["case_health_score"] = (
-    0.5 * np.clip(100 - df["age_days"] / 5, 0, 100) +
+judge_cases["case_health_score"] = (
+    0.5 * np.clip(100 - judge_cases["age_days"] / 5, 0, 100) +
     0.3 * np.where(
-        df["current_status"].str.contains("disposed", case=False, na=False),
+        judge_cases["current_status"].str.contains("disposed", case=False, na=False),
         100,
         60,
     )
 ).round(1)
 
-df["priority_score"] = (
-    0.6 * (100 - df["case_health_score"]) +
-    0.4 * np.clip(df["age_days"] / 10, 0, 100)
+judge_cases["priority_score"] = (
+    0.6 * (100 - judge_cases["case_health_score"]) +
+    0.4 * np.clip(judge_cases["age_days"] / 10, 0, 100)
 ).round(1)
 
-# -------------------------------------------------
-# JUDGE CONTEXT
-# -------------------------------------------------
-judge = st.session_state.user_name
-judge_cases = df[df["judge"].str.upper() == judge.upper()]
-
-if judge_cases.empty:
-    st.warning(f"No cases found for Judge: {judge}")
-    st.stop()
-
 st.success(f"{('logged_in_as')} {judge}")
 
 # -------------------------------------------------
@@ -128,9 +102,11 @@ page = st.pills(
 # -------------------------------------------------
 if page == "case_management":
     st.header(("case_management"))
-    st.dataframe(
-        judge_cases.sort_values("priority_score", ascending=False),
-        use_container_width=True
+    paginated_table(
+        judge_cases,
+        key="judge_cases",
+        sort_by="priority_score",
+        ascending=False,
     )
 
 # -------------------------------------------------
@@ -152,19 +128,17 @@ elif page == "hearing_overview":
 
     today = pd.to_datetime("today").normalize()
 
-    if "nexthearingdate" in judge_cases.columns:
-        judge_cases["nexthearingdate"] = pd.to_datetime(
-            judge_cases["nexthearingdate"], errors="coerce"
-        )
-        today_hearings = judge_cases[judge_cases["nexthearingdate"] == today]
-        upcoming_hearings = judge_cases[judge_cases["nexthearingdate"] > today]
-    else:
-        today_hearings = upcoming_hearings = pd.DataFrame()
-
-    rescheduled = (
-        judge_cases[judge_cases["previoushearing"].notnull()]
-        if "previoushearing" in judge_cases.columns
-        else pd.DataFrame()
+    # Binary searches in the judge's slice of the hearing calendars
+    def docket_rows(positions):
+        return judge_cases.iloc[np.flatnonzero(np.isin(judge_positions, positions))]
+
+    calendar = dataset.hearing_calendar("nexthearingdate")
+    today_hearings = docket_rows(calendar.on(today, judge=judge))
+    upcoming_hearings = docket_rows(
+        calendar.between(today + pd.Timedelta(days=1), judge=judge)
+    )
+    rescheduled = docket_rows(
+        dataset.hearing_calendar("previoushearing").between(judge=judge)
     )
 
     st.subheader("Today's Hearings")
@@ -184,7 +158,7 @@ elif page == "dashboard":
 
     if "disposal_year" in judge_cases.columns:
         trend = (
-            judge_cases.groupby("disposal_year")
+            judge_cases.groupby("disposal_year", observed=True)
             .size()
             .reset_index(name="count")
         )
@@ -192,7 +166,7 @@ elif page == "dashboard":
         st.plotly_chart(fig, use_container_width=True)
 
     status_df = (
-        judge_cases.groupby("current_status")
+        judge_cases.groupby("current_status", observed=True)
         .size()
         .reset_index(name="count")
     )
@@ -5,7 +5,7 @@ from datetime import timedelta
 from streamlit_cookies_manager import EncryptedCookieManager
 from components.language import render_language_header
 
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from dataset import get_dataset
 from helpers.sidebar import render_sidebar
 from sessions import validate_token
 from utils import load_notes, save_notes, load_reminders, save_reminders
@@ -45,16 +45,9 @@ render_sidebar()
 # -------------------------------------------------
 # DATA
 # -------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_all():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged = merge_data(cases, hearings)
-    merged.columns = merged.columns.str.lower().str.strip()
-    return merged
-
-df = load_all()
+dataset = get_dataset()
+df = dataset.case_facts   # one row per case, with hearing facts
+cnr_index = dataset.cnr_index
 
 # -------------------------------------------------
 # HEALTH
@@ -73,10 +66,9 @@ df["case_health_score"] = (
 # -------------------------------------------------
 lawyer = st.session_state.user_name
 
-portfolio = df[
-    df["petitioneradvocate"].str.contains(lawyer, case=False, na=False) |
-    df["respondentadvocate"].str.contains(lawyer, case=False, na=False)
-]
+lawyer_names = dataset.advocate_index.names(lawyer)
+portfolio_positions = dataset.advocate_index.rows(lawyer)
+portfolio = df.iloc[portfolio_positions]
 
 if portfolio.empty:
     st.info(("no_cases"))
@@ -88,9 +80,10 @@ st.success(f"{('logged_in_as')} {lawyer}")
 # LAWYER HEALTH
 # -------------------------------------------------
 active = portfolio[portfolio["current_status"].str.lower() != "disposed"]
-hearings_7 = portfolio[
-    (pd.to_datetime(portfolio["nexthearingdate"], errors="coerce") <= today + timedelta(days=7))
-]
+due_7 = dataset.hearing_calendar("nexthearingdate").between(
+    end=today + timedelta(days=7), advocates=lawyer_names
+)
+hearings_7 = portfolio.iloc[np.flatnonzero(np.isin(portfolio_positions, due_7))]
 
 pressure = 0.4 * len(active) + 0.3 * len(hearings_7)
 lawyer_health = int(np.clip(100 - pressure * 2, 0, 100))
@@ -119,10 +112,8 @@ notes = load_notes()
 reminders = load_reminders()
 
 if cnr:
-    case = portfolio[portfolio["cnr_number"] == cnr]
-    if not case.empty:
-        row = case.iloc[0]
-
+    row = cnr_index.lookup(df, cnr)
+    if row is not None and row.name in portfolio.index:
         st.markdown(f"### {('notes')}")
         note_text = st.text_area("", notes.get(cnr, ""))
         if st.button(("save_notes")):
@@ -1,7 +1,7 @@
 import streamlit as st
 import warnings
 
-from preprocessing import load_data, clean_cases, clean_hearings, merge_data
+from dataset import get_dataset
 from auth import verify_password, set_password, is_first_login, get_default_password
 from sessions import create_token, validate_token, get_token
 import pandas as pd
@@ -82,19 +82,8 @@ if "authenticated" not in st.session_state:
 # -------------------------------------------------
 # Load Data
 # -------------------------------------------------
-@st.cache_resource
-def load_all_data():
-    cases, hearings = load_data()
-    cases = clean_cases(cases)
-    hearings = clean_hearings(hearings)
-    merged = merge_data(cases, hearings)
-
-    cases.columns = cases.columns.str.strip().str.lower()
-    hearings.columns = hearings.columns.str.strip().str.lower()
-    merged.columns = merged.columns.str.strip().str.lower()
-    return cases, hearings, merged
-
-cases, hearings, merged = load_all_data()
+dataset = get_dataset()
+cases, hearings, merged = dataset.cases, dataset.hearings, dataset.merged
 
 # -------------------------------------------------
 # Sidebar
@@ -144,22 +133,14 @@ with right:
                 st.error("Incorrect password.")
             else:
                 if role == "Judge":
-                    judge_cases = merged[
-                        merged.get("beforehonourablejudges", pd.Series("", index=merged.index))
-                        .str.contains(name, case=False, na=False)
-                    ]
-                    if judge_cases.empty:
+                    if name not in dataset.judge_index:
                         st.error("No cases found for this Judge.")
                         st.stop()
 
                     st.session_state.user_role = "Judge"
 
                 else:  # Advocate
-                    advocate_cases = merged[
-                        merged["petitioneradvocate"].str.contains(name, case=False, na=False) |
-                        merged["respondentadvocate"].str.contains(name, case=False, na=False)
-                    ]
-                    if advocate_cases.empty:
+                    if not len(dataset.advocate_index.rows(name)):
                         st.error("No cases found for this Advocate.")
                         st.stop()
 
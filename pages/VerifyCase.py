@@ -1,5 +1,6 @@
 import streamlit as st
-from preprocessing import load_data, clean_cases
+import pandas as pd
+from dataset import get_cnr_index, get_dataset
 
 st.title("Nyayadrishti Case Verification")
 
@@ -7,19 +8,19 @@ st.title("Nyayadrishti Case Verification")
 cnr = st.experimental_get_query_params().get("cnr", [""])[0]
 
 # ------------------ LOAD CASES ------------------
-cases, _ = load_data()
-cases = clean_cases(cases)
+dataset = get_dataset()   # one version for both, so positions match
+cases = dataset.case_facts   # each case with its hearing facts
+cnr_index = get_cnr_index(dataset)
 
 # ------------------ VERIFICATION LOGIC ------------------
 if not cnr:
     st.info("Scan a QR code with a CNR number to verify the case.")
 else:
-    case = cases[cases["cnr_number"] == cnr]
-    
-    if case.empty:
+    case = cnr_index.lookup(cases, cnr)
+
+    if case is None:
         st.error("❌ Case not found or invalid CNR.")
     else:
-        case = case.iloc[0]
         st.success(f"✅ Case Verified: {case['cnr_number']}")
         
         st.markdown("### Case Details")
@@ -29,8 +30,11 @@ else:
             "Filing Year": case.get("filing_year", "N/A"),
             "Total Hearings": case.get("total_hearings", "N/A"),
             "Status": "Disposed" if case.get("disposal_days", 0) > 0 else "Pending",
-            "Advocate": case.get("PetitionerAdvocate", "N/A"),
-            "Presiding Judge": case.get("Njdg_Judge_Name", "N/A"),
+            "Advocate": case.get("petitioneradvocate", "N/A"),
+            "Presiding Judge": case.get("njdg_judge_name", "N/A"),
+            "Hearings on Record": int(case["hearing_count"]) if pd.notna(case.get("hearing_count")) else 0,
+            "Last Hearing": str(case["last_hearing"].date()) if pd.notna(case.get("last_hearing")) else "N/A",
+            "Current Stage": case["last_stage"] if pd.notna(case.get("last_stage")) else "N/A",
         })
 
         st.markdown("---")
@@ -0,0 +1,180 @@
+"""
+Disposal-time predictions and their labels for the AI_Predictions page.
+
+Each label is a small set of fixed strings, so it is computed as integer
+codes from comparisons over whole columns and returned as a categorical.
+The labels equal those of the row-by-row rules they replace.
+
+``LinearPredictor`` evaluates the weighted rule for new slider values
+without copying the cases, and its error metrics from per-cell summaries.
+"""
+
+import numpy as np
+import pandas as pd
+
+from aggregates import weighted_quantile
+
+RISK_LABELS = ["Low", "Medium", "High"]
+
+# Bottleneck label per (high hearings, old backlog) bit pattern
+BOTTLENECK_LABELS = [
+    "Normal flow",
+    "High hearings",
+    "Old backlog",
+    "High hearings & Old backlog",
+]
+
+HIGH_HEARINGS = 8
+
+
+def classify_delay_risk(predicted, low_th, high_th):
+    """
+    "Low" up to ``low_th``, "Medium" up to ``high_th``, else "High"
+    (missing predictions are "High", as the scalar rule had it).
+    """
+    predicted = np.asarray(predicted, dtype=float)
+    # Comparisons with NaN are False, so missing values fall through to High
+    codes = np.full(len(predicted), 2, dtype=np.int8)
+    codes[predicted <= high_th] = 1
+    codes[predicted <= low_th] = 0
+    return pd.Categorical.from_codes(codes, RISK_LABELS)
+
+
+def detect_bottlenecks(total_hearings, filing_year, min_year):
+    """
+    "High hearings" when a case had ``HIGH_HEARINGS`` or more hearings,
+    "Old backlog" when it was filed within a year of ``min_year``, both
+    joined by " & ", else "Normal flow".
+    """
+    hearings = np.asarray(total_hearings, dtype=float)
+    years = np.asarray(filing_year, dtype=float)
+    codes = (hearings >= HIGH_HEARINGS).astype(np.int8) + 2 * (years <= min_year + 1).astype(np.int8)
+    return pd.Categorical.from_codes(codes, BOTTLENECK_LABELS)
+
+
+# -------------------------------
+# Linear rule
+# -------------------------------
+def _values(cases, column):
+    if column not in cases.columns:
+        return np.full(len(cases), np.nan)
+    return pd.to_numeric(cases[column], errors="coerce").to_numpy(dtype=float)
+
+
+class LinearPredictor:
+    """
+    The hand-weighted rule ``hearings × hearing_weight + (filing_year -
+    min_year) × year_weight + baseline`` over a fixed cases frame.
+
+    The input vectors are kept once, so a prediction is plain arithmetic
+    over them (no frame copy, nothing hashed). Every case with the same
+    hearings and filing year gets the same prediction, so per such cell the
+    sorted actual disposal days and their prefix sums are kept as well:
+    MAE, MAPE, mean and quantiles of the predictions then cost one pass
+    over the cells, whatever the number of cases.
+    """
+
+    def __init__(self, cases):
+        self._hearings = _values(cases, "total_hearings")
+        years = _values(cases, "filing_year")
+        self.min_year = np.nanmin(years) if np.isfinite(years).any() else np.nan
+        self._age = years - self.min_year
+
+        # Cases with a prediction, by (hearings, age, actual); missing actuals last
+        actual = _values(cases, "disposal_days")
+        rows = np.flatnonzero(~np.isnan(self._hearings) & ~np.isnan(self._age))
+        rows = rows[np.lexsort((actual[rows], self._age[rows], self._hearings[rows]))]
+        hearings, age, actual = self._hearings[rows], self._age[rows], actual[rows]
+
+        new_cell = np.ones(len(rows), dtype=bool)
+        new_cell[1:] = (hearings[1:] != hearings[:-1]) | (age[1:] != age[:-1])
+        starts = np.flatnonzero(new_cell)
+        cell = np.cumsum(new_cell) - 1
+
+        self._cell_hearings = hearings[starts]
+        self._cell_age = age[starts]
+        self._cell_counts = np.diff(np.append(starts, len(rows)))
+
+        # Recorded actuals of each cell are rows [start, end) of the sorted order
+        known = ~np.isnan(actual)
+        self._starts = starts
+        self._ends = starts + np.bincount(cell, weights=known, minlength=len(starts)).astype(np.int64)
+
+        # Cell-major search keys: 2 × cell + actual scaled into [0, 1), missing at 1
+        self._low = actual[known].min() if known.any() else 0.0
+        self._span = (actual[known].max() - self._low + 1) if known.any() else 1.0
+        self._keys = 2.0 * cell + np.where(known, (actual - self._low) / self._span, 1.0)
+
+        actual = np.where(known, actual, 0.0)
+        nonzero = known & (actual != 0)
+        inverse = np.where(nonzero, 1 / np.where(nonzero, np.abs(actual), 1), 0.0)
+        self._sum_actual = np.concatenate([[0.0], np.cumsum(actual)])
+        self._sum_inverse = np.concatenate([[0.0], np.cumsum(inverse)])
+        self._sum_sign = np.concatenate([[0.0], np.cumsum(np.sign(actual) * nonzero)])
+        self._n_known = int(known.sum())
+        self._n_nonzero = int(nonzero.sum())
+
+    def predict(self, hearing_weight, year_weight, baseline):
+        """Predicted disposal days per case (NaN without hearings or filing year)."""
+        return np.round(self._hearings * hearing_weight + self._age * year_weight + baseline, 0)
+
+    def _cell_predictions(self, hearing_weight, year_weight, baseline):
+        return np.round(self._cell_hearings * hearing_weight + self._cell_age * year_weight + baseline, 0)
+
+    def mean(self, hearing_weight, year_weight, baseline):
+        """Mean prediction over the cases that have one."""
+        predicted = self._cell_predictions(hearing_weight, year_weight, baseline)
+        return np.average(predicted, weights=self._cell_counts) if len(predicted) else np.nan
+
+    def quantile(self, q, hearing_weight, year_weight, baseline):
+        """Quantile(s) ``q`` of the predictions, as ``Series.quantile`` gives them."""
+        predicted = self._cell_predictions(hearing_weight, year_weight, baseline)
+        return weighted_quantile(predicted, self._cell_counts, q)
+
+    def errors(self, hearing_weight, year_weight, baseline):
+        """
+        ``(mae, mape)`` of the predictions against the recorded disposal
+        days (MAPE in percent, over non-zero actuals). NaN when no case has
+        both a prediction and an actual.
+        """
+        predicted = self._cell_predictions(hearing_weight, year_weight, baseline)
+        query = 2.0 * np.arange(len(predicted)) + np.clip((predicted - self._low) / self._span, -0.5, 1.5)
+        split = np.clip(np.searchsorted(self._keys, query), self._starts, self._ends)
+
+        def below_above(prefix):
+            return prefix[split] - prefix[self._starts], prefix[self._ends] - prefix[split]
+
+        # Per cell: sum |a - p| = p·n_below - sum_below + sum_above - p·n_above
+        n_below, n_above = split - self._starts, self._ends - split
+        actual_below, actual_above = below_above(self._sum_actual)
+        absolute = (predicted * (n_below - n_above) - actual_below + actual_above).sum()
+
+        # Likewise for |a - p| / |a|, with 1/|a| and sign(a) in place of 1 and a
+        inverse_below, inverse_above = below_above(self._sum_inverse)
+        sign_below, sign_above = below_above(self._sum_sign)
+        relative = (predicted * (inverse_below - inverse_above) - sign_below + sign_above).sum()
+
+        mae = absolute / self._n_known if self._n_known else np.nan
+        mape = relative / self._n_nonzero * 100 if self._n_nonzero else np.nan
+        return mae, mape
+
+
+def prediction_errors(predicted, actual):
+    """
+    ``(mae, mape)`` of any predictions, on the terms of
+    ``LinearPredictor.errors`` (one pass over the cases).
+    """
+    predicted = np.asarray(predicted, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    known = ~np.isnan(predicted) & ~np.isnan(actual)
+    error = np.abs(actual[known] - predicted[known])
+    nonzero = actual[known] != 0
+
+    mae = error.mean() if len(error) else np.nan
+    mape = (error[nonzero] / np.abs(actual[known][nonzero])).mean() * 100 if nonzero.any() else np.nan
+    return mae, mape
+
+
+def fixed_bands(predicted):
+    """``(best_case, worst_case)`` days as fixed multiples of the prediction."""
+    return np.round(predicted * 0.8, 0), np.round(predicted * 1.25, 0)
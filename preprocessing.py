@@ -1,8 +1,14 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import warnings
 import logging
 import os
+from pathlib import Path
+
+from dates import parse_date
+from schema import apply_schema, normalize_name, date_format
+from snapshot import read_table
 
 os.environ['PYTHONWARNINGS'] = 'ignore::DeprecationWarning'
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -23,34 +29,66 @@ except:
 # -------------------------------
 # Step 1: Load Data
 # -------------------------------
-@st.cache_data(ttl=3600)   # caches for 1 hour
-def load_data():
-    from pathlib import Path
-
-    base_dir = Path(__file__).parent
-
-    cases_path = base_dir / "data" / "ISDMHack_Cases_students.csv"
-    hearings_path = base_dir / "data" / "ISDMHack_Hear_students.csv"
-
-
-
-    cases = pd.read_csv(cases_path)
-    hearings = pd.read_csv(hearings_path)
+BASE_DIR = Path(__file__).parent
+CASES_PATH = BASE_DIR / "data" / "ISDMHack_Cases_students.csv"
+HEARINGS_PATH = BASE_DIR / "data" / "ISDMHack_Hear_students.csv"
+
+# Columns computed by the cleaning step, and the source columns they need
+DERIVED_COLUMNS = {
+    'disposal_days': ('date_filed', 'decision_date'),
+    'filing_year': ('date_filed',),
+    'business_on_date': ('businessondate',),
+}
+
+def source_columns(columns):
+    """Source columns needed to produce ``columns`` (None means all)."""
+    if columns is None:
+        return None
+    needed = {'cnr_number'}
+    for col in columns:
+        needed.update(DERIVED_COLUMNS.get(col, (col,)))
+    return sorted(needed)
+
+def read_sources(cases_columns=None, hearings_columns=None, backend=None):
+    """
+    Uncached read of the raw cases and hearings tables (schema dtypes applied).
+    Column lists may name derived columns; their inputs are read instead.
+    """
+    cases = apply_schema(read_table(CASES_PATH, source_columns(cases_columns), backend))
+    hearings = apply_schema(read_table(HEARINGS_PATH, source_columns(hearings_columns), backend))
 
     return cases, hearings
 
+@st.cache_data(ttl=3600)   # caches for 1 hour
+def load_data(cases_columns=None, hearings_columns=None, backend=None):
+    """
+    Load the raw cases and hearings tables.
+    Reads go through the columnar snapshot (see snapshot.py), so only the
+    first load after a CSV changes pays the parse cost. Optional column
+    lists (normalized or derived names) restrict what is read; ``backend`` picks the
+    CSV parser ("pyarrow", "process" or "c", see csv_backends.py).
+    """
+    return read_sources(cases_columns, hearings_columns, backend)
+
 # -------------------------------
 # Step 2: Normalize column names
 # -------------------------------   
 def normalize_columns(df):
-    df.columns = [c.strip().lower().replace(' ', '_') for c in df.columns]
+    df.columns = [normalize_name(c) for c in df.columns]
     return df
 
 # -------------------------------
 # Step 3: Clean Cases Data
 # -------------------------------
-def clean_cases(cases):
+def clean_cases(cases, columns=None, keep="first"):
+    """
+    Clean the cases table. ``columns`` optionally restricts the result (and
+    the date parsing) to the given normalized/derived columns; the CNR is
+    always kept. ``keep`` picks which row of a repeated CNR survives
+    ("last" treats later rows as corrections, like ``ingest.upsert_cases``).
+    """
     cases = normalize_columns(cases)
+    wanted = source_columns(columns)
 
     col_map = {
         'cnr_number': 'cnr_number',
@@ -60,58 +98,111 @@ def clean_cases(cases):
     }
     cases.rename(columns=col_map, inplace=True)
 
-    # Convert dates safely
+    # Declared dtypes (categoricals, integer counters)
+    cases = apply_schema(cases)
+
+    # Convert dates safely, using their declared formats
     for col in ['date_filed', 'decision_date', 'registration_date']:
-        if col in cases.columns:
-            cases[col] = pd.to_datetime(cases[col], errors='coerce')
+        if col in cases.columns and (wanted is None or col in wanted):
+            cases[col] = parse_date(cases[col], date_format(col))
 
     # Calculate disposal_days if possible
-    if 'date_filed' in cases.columns and 'decision_date' in cases.columns:
+    if 'date_filed' in cases.columns and 'decision_date' in cases.columns \
+            and (columns is None or 'disposal_days' in columns):
         cases['disposal_days'] = (cases['decision_date'] - cases['date_filed']).dt.days + 1
 
     # Filing year
-    if 'date_filed' in cases.columns:
+    if 'date_filed' in cases.columns and (columns is None or 'filing_year' in columns):
         cases['filing_year'] = cases['date_filed'].dt.year
 
     # Ensure total_hearings column exists
-    if 'total_hearings' not in cases.columns:
+    if 'total_hearings' not in cases.columns and (columns is None or 'total_hearings' in columns):
         cases['total_hearings'] = 0
 
     # Drop duplicate CNRs
     if 'cnr_number' in cases.columns:
-        cases = cases.drop_duplicates(subset='cnr_number')
+        cases = cases.drop_duplicates(subset='cnr_number', keep=keep)
         cases['cnr_number'] = cases['cnr_number'].astype(str)
 
+    if columns is not None:
+        keep = set(columns) | {'cnr_number'}
+        cases = cases[[c for c in cases.columns if c in keep]]
+
     return cases
 
 # -------------------------------
 # Step 4: Clean Hearings Data
 # -------------------------------
-def clean_hearings(hearings):
-    hearings = normalize_columns(hearings).copy()
+def clean_hearings(hearings, dedupe=True, columns=None):
+    """
+    Clean the hearings table. ``columns`` optionally restricts the result
+    to the given normalized/derived columns; the CNR is always kept.
+    """
+    hearings = apply_schema(normalize_columns(hearings).copy())
 
     # Convert dates
-    if 'businessondate' in hearings.columns:
-        hearings['business_on_date'] = pd.to_datetime(hearings['businessondate'], errors='coerce')
+    if 'businessondate' in hearings.columns and (columns is None or 'business_on_date' in columns):
+        hearings['business_on_date'] = parse_date(hearings['businessondate'], date_format('businessondate'))
 
-    # Drop duplicate CNRs
+    # Drop duplicate CNRs (dedupe=False keeps the full hearing history)
     if 'cnr_number' in hearings.columns:
-        hearings = hearings.drop_duplicates(subset='cnr_number')
+        if dedupe:
+            hearings = hearings.drop_duplicates(subset='cnr_number')
         hearings.loc[:, 'cnr_number'] = hearings['cnr_number'].astype(str)
 
+    if columns is not None:
+        keep = set(columns) | {'cnr_number'}
+        hearings = hearings[[c for c in hearings.columns if c in keep]]
+
     return hearings
 
 # -------------------------------
-# Step 5: Memory-safe merge
+# Step 5: Indexed merge
 # -------------------------------
-def merge_data(cases, hearings, chunk_size=100000):
-    merged_chunks = []
-    for start in range(0, len(hearings), chunk_size):
-        chunk = hearings.iloc[start:start+chunk_size]
-        merged_chunk = chunk.merge(cases, on='cnr_number', how='left')
-        merged_chunks.append(merged_chunk)
-    merged_data = pd.concat(merged_chunks, ignore_index=True)
-    return merged_data
+def merge_data(cases, hearings, columns=None, key='cnr_number'):
+    """
+    Left-join case attributes onto every hearing row by ``key``.
+
+    Equivalent to ``hearings.merge(cases, on=key, how='left')``: case keys
+    are hashed once to a row position per hearing, every case column is gathered with a single
+    ``take`` and the result is assembled in one allocation (hearing columns
+    are shared, not copied). ``columns`` optionally limits the output to
+    the given columns; the key is always kept.
+    """
+    wanted = None if columns is None else set(columns) | {key}
+
+    # One hash pass over both key columns. Cases come first, so with
+    # unique case keys case i gets code i and a hearing's code is the row
+    # position of its case (codes past the cases mean "no case").
+    n_cases = len(cases)
+    codes, _ = pd.factorize(pd.concat([cases[key], hearings[key]], ignore_index=True))
+    case_codes, positions = codes[:n_cases], codes[n_cases:]
+
+    if not np.array_equal(case_codes, np.arange(n_cases)):
+        # Duplicate or missing case keys multiply rows; leave that to pandas
+        merged = hearings.merge(cases, on=key, how='left')
+        return merged if wanted is None else merged[[c for c in merged.columns if c in wanted]]
+
+    # -1 marks hearings without a case; those rows get missing values
+    positions = np.where(positions < n_cases, positions, -1)
+    has_missing = bool((positions < 0).any())
+
+    overlap = (set(hearings.columns) & set(cases.columns)) - {key}
+
+    data = {}
+    for col in hearings.columns:
+        name = f"{col}_x" if col in overlap else col
+        if wanted is None or name in wanted:
+            data[name] = hearings[col].array
+
+    for col in cases.columns:
+        if col == key:
+            continue
+        name = f"{col}_y" if col in overlap else col
+        if wanted is None or name in wanted:
+            data[name] = cases[col].array.take(positions, allow_fill=has_missing)
+
+    return pd.DataFrame(data, index=pd.RangeIndex(len(hearings)), copy=False)
 
 # -------------------------------
 # Example usage
@@ -0,0 +1,69 @@
+"""
+Declared column schema for the NJDG cases and hearings tables.
+
+Keys are normalized column names (see ``normalize_name``), so the schema
+applies to raw frames straight from the CSV as well as to cleaned ones.
+"""
+
+import pandas as pd
+
+
+def normalize_name(name):
+    """Normalized form of a column name: stripped, lower case, underscores."""
+    return str(name).strip().lower().replace(" ", "_")
+
+
+# Repetitive strings -> pandas categoricals
+CATEGORICAL_COLUMNS = {
+    "current_status",
+    "court_name",
+    "case_type",
+    "remappedstages",
+    "beforehonourablejudges",
+    "njdg_judge_name",
+    "petitioneradvocate",
+    "respondentadvocate",
+    "purposeoflisting",
+}
+
+# Integer counters. int32 rather than the smallest fitting type, so
+# arithmetic like ``total_hearings * weight`` cannot overflow.
+INTEGER_COLUMNS = {
+    "total_hearings": "int32",
+}
+
+# Date columns and the format they are expected in (dates.py verifies the
+# format per column and falls back to detection)
+DATE_FORMATS = {
+    "date_filed": "%Y-%m-%d",
+    "decision_date": "%Y-%m-%d",
+    "registration_date": "%Y-%m-%d",
+    "businessondate": "%Y-%m-%d",
+    "nexthearingdate": "%Y-%m-%d",
+    "previoushearing": "%Y-%m-%d",
+}
+
+
+def _to_counter(series, dtype):
+    values = pd.to_numeric(series, errors="coerce")
+    if values.isna().any():
+        return values.astype("float32")
+    return values.astype(dtype)
+
+
+def apply_schema(df):
+    """Cast categorical and integer columns in place; returns ``df``."""
+    for col in df.columns:
+        key = normalize_name(col)
+
+        if key in CATEGORICAL_COLUMNS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+        elif key in INTEGER_COLUMNS:
+            df[col] = _to_counter(df[col], INTEGER_COLUMNS[key])
+
+    return df
+
+
+def date_format(column):
+    """Declared format of a date column, or None."""
+    return DATE_FORMATS.get(normalize_name(column))
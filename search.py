@@ -0,0 +1,308 @@
+"""
+Prefix and typo-tolerant search over case identifiers.
+
+``CaseSearch`` indexes every case under its CNR and, when available, its
+combined case number. Keys are normalized to upper-case alphanumerics and
+kept as fixed-width byte strings, so the index is a few numpy arrays even
+for tens of millions of cases:
+
+- prefix (autocomplete) queries are two binary searches in the sorted keys
+- fuzzy queries use positional trigrams: each key is indexed under every
+  trigram together with its offset. A key within k edits of the query
+  shares all but at most 3k of the query's trigrams, each at an offset
+  shifted by at most k (the q-gram lemma), so counting those shared
+  trigrams never drops a true match. The keys passing the count get an
+  exact (bit-parallel) edit-distance check. Queries too short for the
+  count look up their one-edit variants as prefixes instead.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+GRAM = 3
+
+# Trigram offsets are indexed up to this (they share a 32-bit code with
+# the characters); CNRs and case numbers are far shorter
+MAX_OFFSET = 255
+
+# Trigrams carried by more than this share of the keys (e.g. the state and
+# court prefix every CNR starts with) are left out of the candidate count
+# when the threshold allows it; they barely narrow the search
+COMMON_GRAM = 0.05
+
+# Candidate keys per vectorized edit-distance pass (bounds its matrices)
+VERIFY_BATCH = 100000
+
+# Characters kept in keys and queries (the others are dropped)
+KEY_CHARS = [bytes([char]) for char in b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+NON_KEY = r"[^0-9A-Z]"
+
+
+def normalize_key(text):
+    """Upper-case alphanumeric (ASCII) form of a CNR or case number."""
+    return re.sub(NON_KEY, "", str(text).upper())
+
+
+def _normalize_keys(values):
+    """``normalize_key`` over a column, as fixed-width bytes ("" where missing)."""
+    keys = pd.Series(values, dtype=object).fillna("").astype(str)
+    return keys.str.upper().str.replace(NON_KEY, "", regex=True).to_numpy(dtype="S")
+
+
+def _gram_code(window, start):
+    """
+    Codes of the trigrams in the columns of ``window`` (three rows of
+    characters) at offset ``start``: the characters, then the offset.
+    """
+    return (window[0] << 24) | (window[1] << 16) | (window[2] << 8) | np.uint32(start)
+
+
+class CaseSearch:
+    """
+    Autocomplete and fuzzy lookup from (partial, possibly mistyped) CNRs or
+    case numbers to CNRs.
+    """
+
+    def __init__(self, cnrs, case_numbers=None):
+        self._cnrs = pd.Index(np.asarray(cnrs, dtype=object))
+        self._labels = None if case_numbers is None else np.asarray(case_numbers, dtype=object)
+
+        sources = [self._cnrs] if case_numbers is None else [self._cnrs, self._labels]
+        self._n_sources = len(sources)
+        keys = np.concatenate([_normalize_keys(values) for values in sources])
+        rows = np.tile(np.arange(len(self._cnrs), dtype=np.int64), len(sources))
+
+        present = keys != b""
+        keys, rows = keys[present], rows[present]
+
+        # Prefix search: keys in sorted order
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._rows = keys[order], rows[order]
+
+        self._build_grams()
+
+    def _build_grams(self):
+        """(trigram, offset) codes -> entries (positions in ``self._keys``)."""
+        width = self._keys.dtype.itemsize
+        # One row per key, NUL-padded; transposed so each offset is contiguous
+        self._chars = np.ascontiguousarray(self._keys.view(np.uint8).reshape(len(self._keys), width).T)
+
+        codes, entries = [], []
+        for start in range(min(width - GRAM, MAX_OFFSET) + 1):
+            window = self._chars[start:start + GRAM].astype(np.uint32)
+            valid = (window > 0).all(axis=0)
+            codes.append(_gram_code(window[:, valid], start))
+            entries.append(np.flatnonzero(valid))
+        codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.uint32)
+        entries = np.concatenate(entries) if entries else np.empty(0, dtype=np.int64)
+
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        self._postings = entries[order].astype(np.int32)
+        self._codes, starts = np.unique(codes, return_index=True)
+        self._code_offsets = np.append(starts, len(codes))
+
+    def __len__(self):
+        return len(self._cnrs)
+
+    def prefix(self, query, limit=10):
+        """Row positions of keys starting with ``query``, in key order."""
+        key = normalize_key(query).encode()
+        if not key:
+            return np.empty(0, dtype=np.int64)
+        lo = np.searchsorted(self._keys, key, side="left")
+        hi = np.searchsorted(self._keys, key + b"\xff", side="left")
+        # A row has at most one key per source, so this many entries hold
+        # ``limit`` distinct rows whenever there are that many matches
+        hi = min(hi, lo + limit * self._n_sources)
+        return pd.unique(self._rows[lo:hi])[:limit]
+
+    def _one_edit_candidates(self, key, limit):
+        """
+        Entries that may rank among the ``limit`` closest within one edit of
+        ``key``: such a key starts with a string at most one edit from it,
+        and only the first keys (in key order) of each such prefix can
+        outrank the others.
+        """
+        raw = key.encode()
+        neighbours = {raw}
+        for i in range(len(raw)):
+            neighbours.add(raw[:i] + raw[i + 1:])
+            for char in KEY_CHARS:
+                neighbours.add(raw[:i] + char + raw[i + 1:])
+                neighbours.add(raw[:i] + char + raw[i:])
+        neighbours = np.array(sorted(neighbours), dtype="S")
+
+        lo = np.searchsorted(self._keys, neighbours, side="left")
+        hi = np.searchsorted(self._keys, np.char.add(neighbours, b"\xff"), side="left")
+        hi = np.minimum(hi, lo + limit * self._n_sources)
+        ranges = [np.arange(a, b) for a, b in zip(lo, hi) if b > a]
+        return np.unique(np.concatenate(ranges)) if ranges else np.empty(0, dtype=np.int64)
+
+    def _candidates(self, key, max_distance, limit):
+        """
+        Entries that may hold a prefix within ``max_distance`` edits of
+        ``key``: those sharing at least ``len(key) - 2 - 3 * max_distance``
+        of its trigrams, each within ``max_distance`` of its query offset.
+        A trigram left out of the count lowers that threshold by one, which
+        lets the most common trigrams be skipped while it stays positive.
+        """
+        # Only query trigrams whose whole offset window is indexed count
+        n_grams = min(len(key) - GRAM + 1, MAX_OFFSET - max_distance + 1)
+        needed = n_grams - GRAM * max_distance
+        if needed <= 0:
+            # Too short for the count to exclude anything
+            if max_distance == 1:
+                return self._one_edit_candidates(key, limit)
+            return np.arange(len(self._keys))
+
+        raw = np.frombuffer(key.encode(), dtype=np.uint8).astype(np.uint32)
+        last = min(self._keys.dtype.itemsize - GRAM, MAX_OFFSET)
+        windows = []
+        for i in range(n_grams):
+            first, final = max(0, i - max_distance), min(last, i + max_distance)
+            if first > final:
+                continue
+            # Codes order by trigram, then offset: the window is one slice
+            gram = raw[i:i + GRAM, None]
+            lo = np.searchsorted(self._codes, _gram_code(gram, first)[0], side="left")
+            hi = np.searchsorted(self._codes, _gram_code(gram, final)[0], side="right")
+            windows.append((self._code_offsets[hi] - self._code_offsets[lo], lo, hi))
+
+        # Rarest first; stop counting common trigrams once that is allowed
+        windows.sort()
+        common = COMMON_GRAM * len(self._keys)
+        skippable = needed - 1 - (n_grams - len(windows))
+        while skippable > 0 and windows and windows[-1][0] > common:
+            windows.pop()
+            skippable -= 1
+        needed -= n_grams - len(windows)
+
+        shared = []
+        for _, lo, hi in windows:
+            postings = self._postings[self._code_offsets[lo]:self._code_offsets[hi]]
+            # A key repeating the trigram within the window counts once
+            shared.append(postings if hi - lo == 1 else np.unique(postings))
+        entries, hits = np.unique(np.concatenate(shared), return_counts=True)
+        return entries[hits >= needed]
+
+    def _prefix_distances(self, key, entries, limit):
+        """
+        Edit distance between ``key`` and the closest prefix of each key at
+        ``entries``, capped at ``limit + 1``. Bit-parallel (Myers/Hyyrö):
+        one column of the edit-distance table per key character is a few
+        word operations, vectorized over the keys.
+        """
+        m = len(key)
+        if m > 64:
+            return self._prefix_distances_table(key, entries, limit)
+        width = min(self._keys.dtype.itemsize, m + limit)
+        one = np.uint64(1)
+        full = np.uint64((1 << m) - 1)
+        top = np.uint64(1 << (m - 1))
+
+        # Bit i of match[c] is set where key[i] == c
+        match = np.zeros(256, dtype=np.uint64)
+        for i, char in enumerate(key.encode()):
+            match[char] |= np.uint64(1 << i)
+
+        distances = np.empty(len(entries), dtype=np.int16)
+        for first in range(0, len(entries), VERIFY_BATCH):
+            batch = entries[first:first + VERIFY_BATCH]
+            chars = self._chars[:width, batch]
+            lengths = (chars > 0).sum(axis=0)
+
+            plus = np.full(len(batch), full)                 # vertical +1 deltas
+            minus = np.zeros(len(batch), dtype=np.uint64)    # vertical -1 deltas
+            score = np.full(len(batch), m, dtype=np.int16)   # distance to the prefix so far
+            best = score.copy()
+            for j in range(width):
+                eq = match[chars[j]]
+                xv = eq | minus
+                xh = (((eq & plus) + plus) ^ plus) | eq
+                h_plus = minus | ~(xh | plus)
+                h_minus = plus & xh
+                score += (h_plus & top) != 0
+                score -= (h_minus & top) != 0
+                # The first row grows by one per character (prefix from the start)
+                h_plus = (h_plus << one) | one
+                h_minus = h_minus << one
+                plus = (h_minus | ~(xv | h_plus)) & full
+                minus = h_plus & xv
+                best = np.where(j < lengths, np.minimum(best, score), best)
+            distances[first:first + len(batch)] = np.minimum(best, limit + 1)
+        return distances
+
+    def _prefix_distances_table(self, key, entries, limit):
+        """``_prefix_distances`` for queries too long for one 64-bit word."""
+        query = np.frombuffer(key.encode(), dtype=np.uint8)
+        width = min(self._keys.dtype.itemsize, len(key) + limit)
+        columns = np.arange(width + 1, dtype=np.int16)[:, None]
+        distances = np.empty(len(entries), dtype=np.int16)
+
+        for first in range(0, len(entries), VERIFY_BATCH):
+            batch = entries[first:first + VERIFY_BATCH]
+            chars = self._chars[:width, batch]
+            lengths = (chars > 0).sum(axis=0)
+
+            # Levenshtein rows, one column per candidate
+            previous = np.repeat(columns, len(batch), axis=1)
+            for i, q in enumerate(query, 1):
+                current = np.empty_like(previous)
+                current[0] = i
+                for j in range(1, width + 1):
+                    current[j] = np.minimum(
+                        np.minimum(previous[j], current[j - 1]) + 1,
+                        previous[j - 1] + (chars[j - 1] != q),
+                    )
+                previous = current
+            # Only prefixes that exist: lengths up to the key's own
+            previous = np.where(columns <= lengths, previous, limit + 1)
+            distances[first:first + len(batch)] = np.minimum(previous.min(axis=0), limit + 1)
+        return distances
+
+    def fuzzy(self, query, limit=10, max_distance=None):
+        """
+        Row positions of keys whose prefix is within ``max_distance`` edits
+        of ``query`` (default: 1 per 8 characters, at least 1), closest first.
+        """
+        key = normalize_key(query)
+        if len(key) < GRAM or not len(self._keys):
+            return np.empty(0, dtype=np.int64)
+        if max_distance is None:
+            max_distance = max(1, len(key) // 8)
+
+        # Widen the bound only while too few rows are found: every key within
+        # a smaller bound is found exactly and ranks ahead of the rest
+        for bound in range(1, max_distance + 1):
+            entries = self._candidates(key, bound, limit)
+            distances = self._prefix_distances(key, entries, bound)
+            close = distances <= bound
+            entries, distances = entries[close], distances[close]
+
+            # Entries are positions in the sorted keys: ties go by key
+            order = np.lexsort((entries, distances))
+            rows = pd.unique(self._rows[entries[order]])
+            if len(rows) >= limit:
+                break
+        return rows[:limit]
+
+    def suggest(self, query, limit=10):
+        """CNRs matching ``query``: prefix matches first, then close misspellings."""
+        rows = list(self.prefix(query, limit))
+        if len(rows) < limit:
+            seen = set(rows)
+            rows += [r for r in self.fuzzy(query, limit) if r not in seen][:limit - len(rows)]
+        return [self._cnrs[r] for r in rows]
+
+    def describe(self, cnr):
+        """Display label for a suggested CNR (with its case number if known)."""
+        if self._labels is None:
+            return cnr
+        try:
+            label = self._labels[self._cnrs.get_loc(cnr)]
+        except KeyError:
+            return cnr
+        return f"{cnr} ({label})" if isinstance(label, str) and label else cnr
@@ -0,0 +1,147 @@
+"""
+Columnar snapshots of the NJDG source CSVs.
+
+The first load of a CSV converts it once into a Parquet file stored next to
+it in ``data/.snapshots/``, with the dtypes declared in schema.py (categoricals
+are stored dictionary-encoded). The snapshot name carries the source file's size
+and mtime, so replacing the CSV invalidates it automatically. Later loads read
+only the snapshot, and only the columns that were asked for.
+
+CSV parsing goes through csv_backends.py (multi-threaded where available).
+When pyarrow is not installed (or a snapshot cannot be written) the loader
+reads the CSV directly so pages keep working.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from csv_backends import read_csv
+from schema import apply_schema, normalize_name
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+
+def parquet_available():
+    """Whether pyarrow (and so the Parquet snapshots) can be used."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def fingerprint(csv_path):
+    """Identity of a source file: ``<size>-<mtime_ns>``."""
+    stat = Path(csv_path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def snapshot_path(csv_path):
+    """Location of the snapshot matching the current state of ``csv_path``."""
+    csv_path = Path(csv_path)
+    return (
+        csv_path.parent
+        / SNAPSHOT_DIR_NAME
+        / f"{csv_path.stem}.{fingerprint(csv_path)}.parquet"
+    )
+
+
+def _remove_stale(csv_path, keep):
+    for old in keep.parent.glob(f"{Path(csv_path).stem}.*.parquet"):
+        if old != keep:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def build_snapshot(csv_path, backend=None):
+    """
+    Convert ``csv_path`` into its Parquet snapshot.
+    Returns the snapshot path, or None if no snapshot could be written.
+    """
+    if not parquet_available():
+        return None
+
+    target = snapshot_path(csv_path)
+    if target.exists():
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+
+    try:
+        df = apply_schema(read_csv(csv_path, backend=backend))
+        df.to_parquet(tmp, engine="pyarrow", index=False)
+        os.replace(tmp, target)   # atomic, safe with several workers
+    except Exception as e:
+        logger.warning("Could not snapshot %s: %s", csv_path, e)
+        tmp.unlink(missing_ok=True)
+        return None
+
+    _remove_stale(csv_path, target)
+    return target
+
+
+def _resolve_columns(available, columns):
+    """Map requested (normalized) column names onto the raw source names."""
+    if columns is None:
+        return None
+    wanted = {normalize_name(c) for c in columns}
+    return [c for c in available if normalize_name(c) in wanted]
+
+
+def read_table(csv_path, columns=None, backend=None):
+    """
+    Read a source CSV through its columnar snapshot.
+
+    ``columns`` is an optional iterable of column names in normalized form
+    (e.g. ``"cnr_number"``); unknown names are ignored. ``backend`` selects
+    the CSV parser used when the CSV has to be parsed (see csv_backends.py).
+    """
+    path = build_snapshot(csv_path, backend)
+
+    if path is None:
+        return read_csv(csv_path, columns, backend)
+
+    import pyarrow.parquet as pq
+
+    available = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=_resolve_columns(available, columns))
+
+
+def iter_table(csv_path, columns=None, batch_size=100000, backend=None):
+    """
+    Like ``read_table`` but yields the rows in frames of at most
+    ``batch_size``, read one record batch of the snapshot at a time. Without
+    a snapshot the CSV is read whole and then sliced.
+    """
+    path = build_snapshot(csv_path, backend)
+
+    if path is None:
+        df = read_csv(csv_path, columns, backend)
+        for first in range(0, len(df), batch_size):
+            yield df.iloc[first:first + batch_size]
+        return
+
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(path)
+    names = _resolve_columns(source.schema_arrow.names, columns)
+    for batch in source.iter_batches(batch_size=batch_size, columns=names):
+        yield batch.to_pandas()
+
+
+# -------------------------------
+# Pre-build snapshots (e.g. on deploy)
+# -------------------------------
+if __name__ == "__main__":
+    data_dir = Path(__file__).parent / "data"
+    for csv in sorted(data_dir.glob("*.csv")):
+        print(f"{csv.name}: {build_snapshot(csv)}")